@@ -2,10 +2,29 @@
 import config
 
 def create_app():
-    from flask import Flask
+    from flask import Flask, jsonify
+    from .uploads import SpooledRequest
     app = Flask(__name__)
+    app.request_class = SpooledRequest
+    # Werkzeug stops reading the body (413) as soon as it passes the limit
+    app.config['MAX_CONTENT_LENGTH'] = config.MAX_FILE_SIZE_MB * 1024 * 1024
     
-    from .routes import bp
+    @app.errorhandler(413)
+    def request_too_large(error):
+        return jsonify({"error": f"Upload exceeds {config.MAX_FILE_SIZE_MB} MB"}), 413
+    
+    from .routes import api_routes as bp
     app.register_blueprint(bp, url_prefix=config.API_V1_STR)
     
+    from .metrics import metrics
+    
+    @app.route('/metrics')
+    def prometheus_metrics():
+        return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+    
+    if config.PRELOAD_ENGINES:
+        # With gunicorn --preload this happens once in the master, before the workers fork
+        from .warmup import preload_engines
+        preload_engines()
+    
     return app
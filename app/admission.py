@@ -0,0 +1,116 @@
+"""Admission control for OCR work shared by every web worker on the host"""
+import os
+import random
+import time
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional
+from config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows development: no cross-process limit
+    fcntl = None
+
+class Saturated(Exception):
+    """No OCR slot became free in time"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Server is busy, retry later")
+        self.retry_after = retry_after
+
+class AdmissionControl:
+    """A counting semaphore across processes, made of ``slots`` lock files in ``lock_dir``.
+
+    Holding a slot is holding an exclusive ``flock`` on one of the files. The kernel drops the
+    lock when its process exits, so a crashed or killed worker never leaks capacity. Without
+    ``fcntl`` every request is admitted.
+    """
+
+    def __init__(self, lock_dir: str, slots: int):
+        self.lock_dir = lock_dir
+        self.slots = max(1, slots)
+        self.held = 0  # slots held by this process
+
+    @staticmethod
+    def host_cpus() -> int:
+        """CPUs this process may use: its affinity mask, reduced by a cgroup (container) CPU quota"""
+        cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+        try:
+            with open('/sys/fs/cgroup/cpu.max') as f:
+                quota, period = f.read().split()
+            if quota != 'max':
+                cpus = min(cpus, max(1, int(int(quota) / int(period))))
+        except (OSError, ValueError):
+            pass
+        return cpus
+
+    @staticmethod
+    def host_memory() -> Optional[int]:
+        """Bytes of memory available to the container (cgroup limit) or host, if known"""
+        try:
+            with open('/sys/fs/cgroup/memory.max') as f:
+                limit = f.read().strip()
+            if limit != 'max':
+                return int(limit)
+        except (OSError, ValueError):
+            pass
+        try:
+            with open('/proc/meminfo') as f:
+                for line in f:
+                    if line.startswith('MemTotal:'):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError):
+            pass
+        return None
+
+    @classmethod
+    def default_slots(cls) -> int:
+        """``settings.ADMISSION_SLOTS``, or as many OCR requests as the CPUs and memory can carry.
+
+        An admitted request keeps up to ``settings.OCR_WORKERS_PER_REQUEST`` single-threaded
+        Tesseract processes busy and needs ``settings.ADMISSION_MEMORY_PER_SLOT`` bytes.
+        """
+        if settings.ADMISSION_SLOTS:
+            return settings.ADMISSION_SLOTS
+        slots = cls.host_cpus() // max(1, settings.OCR_WORKERS_PER_REQUEST)
+        memory = cls.host_memory()
+        if memory:
+            slots = min(slots, memory // settings.ADMISSION_MEMORY_PER_SLOT)
+        return max(1, slots)
+
+    def try_acquire(self) -> Optional[IO]:
+        """Lock a free slot and return its file, or None when every slot is taken"""
+        os.makedirs(self.lock_dir, exist_ok=True)
+        offset = random.randrange(self.slots)
+        for index in range(self.slots):
+            handle = open(os.path.join(self.lock_dir, f"slot-{(offset + index) % self.slots}.lock"), 'a')
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return handle
+            except OSError:
+                handle.close()
+        return None
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None) -> Iterator[None]:
+        """Hold a slot for the duration of the block.
+
+        Waits up to ``timeout`` seconds (forever if None), then raises ``Saturated``.
+        """
+        if fcntl is None:
+            yield
+            return
+        expires = None if timeout is None else time.monotonic() + timeout
+        handle = self.try_acquire()
+        while handle is None:
+            if expires is not None and time.monotonic() >= expires:
+                raise Saturated(settings.ADMISSION_RETRY_AFTER)
+            time.sleep(0.05)
+            handle = self.try_acquire()
+        self.held += 1
+        try:
+            yield
+        finally:
+            self.held -= 1
+            fcntl.flock(handle, fcntl.LOCK_UN)
+            handle.close()
@@ -0,0 +1,171 @@
+"""Content-addressed result cache with an in-process LRU tier and an on-disk tier"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+class ResultCache:
+    """Two-tier cache for JSON-serializable results.
+
+    The memory tier is an LRU of ``max_items`` entries holding at most ``max_memory_bytes`` of
+    (JSON-encoded) results; a larger result is only kept on disk. The disk tier (optional) stores one
+    JSON file per key under ``disk_dir`` and is shared by every process pointing at the same
+    directory; when it grows past ``max_disk_bytes`` the least recently used files are removed.
+    """
+
+    def __init__(self, name: str, max_items: int = 128, disk_dir: Optional[str] = None, max_disk_bytes: int = 0,
+                 max_memory_bytes: int = 0):
+        self.name = name
+        self.max_items = max_items
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = os.path.join(disk_dir, name) if disk_dir else None
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self.counters = {"hits_memory": 0, "hits_disk": 0, "misses": 0, "sets": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """SHA-256 over the JSON encoding of ``parts`` (digests, mode, parameters, ...)"""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def file_digest(file_path: Union[str, bytes], chunk_size: int = 1 << 20) -> str:
+        """SHA-256 of a file, given its path or its bytes"""
+        if isinstance(file_path, bytes):
+            return hashlib.sha256(file_path).hexdigest()
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.counters["hits_memory"] += 1
+                return self._memory[key]
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["hits_disk"] += 1
+            self._remember(key, *entry)
+        return entry[0]
+
+    def set(self, key: str, value: Any) -> Any:
+        """Store ``value`` and return it as it will be served from the cache.
+
+        Values are normalized through JSON (non-JSON types such as timestamps become
+        strings) so that memory and disk hits return exactly the same thing.
+        """
+        payload = json.dumps(value, default=str)
+        value = json.loads(payload)
+        with self._lock:
+            self.counters["sets"] += 1
+            self._remember(key, value, len(payload))
+        self._write_disk(key, payload.encode())
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.counters, items=len(self._memory), memory_bytes=self._memory_bytes,
+                        disk_bytes=self._disk_bytes or 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._sizes.clear()
+            self._memory_bytes = 0
+
+    def _remember(self, key: str, value: Any, size: int) -> None:
+        self._forget(key)
+        if self.max_memory_bytes and size > self.max_memory_bytes:
+            return
+        self._memory[key] = value
+        self._sizes[key] = size
+        self._memory_bytes += size
+        while len(self._memory) > self.max_items or (self.max_memory_bytes and self._memory_bytes > self.max_memory_bytes):
+            self._forget(next(iter(self._memory)))
+            self.counters["evictions"] += 1
+
+    def _forget(self, key: str) -> None:
+        if key in self._memory:
+            del self._memory[key]
+            self._memory_bytes -= self._sizes.pop(key)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], key + ".json")
+
+    def _read_disk(self, key: str) -> Optional[Tuple[Any, int]]:
+        """(value, encoded size) from the disk tier, or None"""
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                payload = f.read()
+            value = json.loads(payload)
+            os.utime(path)  # mtime doubles as last-access time for eviction
+            return value, len(payload)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, payload: bytes) -> None:
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk()[1]
+            else:
+                self._disk_bytes += len(payload)
+            if self.max_disk_bytes and self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _scan_disk(self):
+        entries, total = [], 0
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return entries, total
+
+    def _evict_disk(self) -> None:
+        # Other processes share the directory, so rescan rather than trust the running total
+        entries, total = self._scan_disk()
+        target = int(self.max_disk_bytes * 0.9)
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            self.counters["evictions"] += 1
+        self._disk_bytes = total
@@ -0,0 +1,51 @@
+"""Columnar (Arrow IPC stream / Parquet) encoding of tabular results"""
+from typing import Any, Dict, Iterable, List
+from .lazy import lazy_import
+
+pa = lazy_import('pyarrow', optional=True)  # optional: columnar output formats are unavailable without pyarrow
+
+class ColumnarEncoder:
+    """Builds an Arrow table from record batches and serializes it.
+
+    Empty cells become nulls and each column gets the Arrow type inferred from its values;
+    a column mixing incompatible types (e.g. numbers and text) is stored as strings.
+    """
+    MIMETYPES = {
+        'arrow': 'application/vnd.apache.arrow.stream',
+        'parquet': 'application/vnd.apache.parquet',
+    }
+
+    @staticmethod
+    def available() -> bool:
+        return pa is not None
+
+    @staticmethod
+    def array(values: List[Any]) -> "pa.Array":
+        try:
+            return pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            return pa.array([None if value is None else str(value) for value in values], pa.string())
+
+    @classmethod
+    def table(cls, batches: Iterable[List[Dict[str, Any]]]) -> "pa.Table":
+        """One table from batches of records that share the first record's keys"""
+        columns: Dict[str, List[Any]] = {}
+        for records in batches:
+            if records and not columns:
+                columns = {name: [] for name in records[0]}
+            for name, values in columns.items():
+                values.extend(record[name] for record in records)
+        return pa.table({name: cls.array(values) for name, values in columns.items()})
+
+    @staticmethod
+    def encode(table: "pa.Table", fmt: str) -> bytes:
+        sink = pa.BufferOutputStream()
+        if fmt == 'arrow':
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+        elif fmt == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(table, sink)
+        else:
+            raise ValueError(f"Unknown columnar format: {fmt}")
+        return sink.getvalue().to_pybytes()
@@ -0,0 +1,140 @@
+"""Process-pool engine for per-page extraction work"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from config import settings
+
+@dataclass
+class PageResult:
+    """Output of one page task. ``timings`` holds seconds per stage (render, preprocess, ocr, ...);
+    ``buffer_bytes`` counts image bytes handed between stages in memory instead of via temp files;
+    ``cached`` is set when the text came from the page cache instead of Tesseract;
+    ``method`` is ``'ocr'`` or ``'text'`` (embedded text layer, see hybrid extraction);
+    ``columns`` holds the per-column text in column mode and ``partitions`` the boundaries used;
+    ``fields`` holds the text of each template region on the page (template mode)."""
+    page: int
+    text: str
+    method: str = 'ocr'
+    columns: Optional[List[str]] = None
+    partitions: Optional[List[float]] = None
+    fields: Optional[Dict[str, str]] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    buffer_bytes: int = 0
+    cached: bool = False
+
+class Deadline:
+    """Time budget for one extraction: ``seconds`` counted from when work starts and/or a fixed
+    ``until`` (Unix time), whichever comes first.
+
+    ``limit`` stops handing out work once starting another item would likely overrun the
+    budget, judging an item's duration by the pace at which items have been taken so far.
+    The first item is always handed out, so every call makes progress. Work already handed
+    out still completes. ``reached`` tells the caller the work was cut short.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, until: Optional[float] = None):
+        self.seconds = seconds
+        self.until = until
+        self.expires: Optional[float] = None
+        self.reached = False
+
+    def start(self) -> None:
+        """Start the clock; later calls keep the first start time"""
+        if self.expires is None:
+            budgets = [self.seconds] if self.seconds is not None else []
+            if self.until is not None:
+                budgets.append(self.until - time.time())
+            self.expires = time.monotonic() + min(budgets, default=float('inf'))
+
+    def limit(self, items: Iterable[Any]) -> Iterator[Any]:
+        iterator = iter(items)
+        self.start()
+        start, taken = time.monotonic(), 0
+        try:
+            while True:
+                now = time.monotonic()
+                pace = (now - start) / taken if taken else 0.0
+                if taken and now + pace >= self.expires:
+                    self.reached = True
+                    return
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                taken += 1
+                yield item
+        finally:
+            # Stop the producer (e.g. the page renderer) instead of leaving it suspended
+            if hasattr(iterator, 'close'):
+                iterator.close()
+
+class PageEngine:
+    """Runs page tasks on a shared process pool and yields results in page order.
+
+    The pool is shared by every request served by this web worker and is sized by
+    ``settings.OCR_MAX_WORKERS`` (the global cap). Each call keeps at most
+    ``max_workers`` pages in flight (the per-request cap, ``settings.OCR_WORKERS_PER_REQUEST``),
+    so one large document cannot queue all of its pages ahead of other requests.
+    """
+    _executor: Optional[ProcessPoolExecutor] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_executor(cls) -> ProcessPoolExecutor:
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ProcessPoolExecutor(max_workers=settings.OCR_MAX_WORKERS)
+            return cls._executor
+
+    @classmethod
+    def shutdown(cls) -> None:
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(cancel_futures=True)
+                cls._executor = None
+
+    @classmethod
+    def map(cls, func: Callable[[Any], Any], items: Iterable[Any], max_workers: Optional[int] = None,
+            cost: Optional[Callable[[Any], int]] = None, max_cost: Optional[int] = None,
+            deadline: Optional[Deadline] = None) -> Iterator[Any]:
+        """Yield ``func(item)`` for each item, in input order.
+
+        ``func`` must be a picklable module-level callable (or a ``functools.partial`` of one).
+        Items are pulled lazily, so a generator of rendered pages is only consumed as fast
+        as the pool drains it. With ``cost``/``max_cost`` the summed cost of the items in
+        flight (e.g. rendered pixels) is kept under ``max_cost`` as well. With a ``deadline`` no
+        new items are started once the time budget is nearly spent.
+        """
+        if deadline is not None:
+            items = deadline.limit(items)
+        limit = min(max_workers or settings.OCR_WORKERS_PER_REQUEST, settings.OCR_MAX_WORKERS)
+        if limit <= 1:
+            for item in items:
+                yield func(item)
+            return
+
+        executor = cls.get_executor()
+        pending = deque()
+        in_flight = 0
+        try:
+            for item in items:
+                item_cost = cost(item) if cost else 0
+                while pending and (len(pending) >= limit or (max_cost and in_flight + item_cost > max_cost)):
+                    future, done_cost = pending.popleft()
+                    in_flight -= done_cost
+                    yield future.result()
+                pending.append((executor.submit(func, item), item_cost))
+                in_flight += item_cost
+            while pending:
+                yield pending.popleft()[0].result()
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); drop the pool so the next request gets a fresh one
+            cls.shutdown()
+            raise
+        finally:
+            for future, _ in pending:
+                future.cancel()
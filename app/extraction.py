@@ -1,84 +1,442 @@
-import os
-import tempfile
-from typing import Tuple, Dict, List, Any
-from pdf2image import convert_from_path
-import pdfplumber
-import cv2
+import itertools
+import time
+from functools import partial
+from typing import Tuple, Dict, List, Any, Callable, Iterator, Optional, Sequence
+import numpy as np
+from .cache import ResultCache
+from .columnar import ColumnarEncoder
+from .engine import Deadline, PageEngine, PageResult
+from .lazy import lazy_import
+from .preprocessing import Preprocessor
+from .regions import Region, Template
+from .rendering import PageRenderer, PageSelection, RenderedPage
+from .spreadsheet import SheetReader
+from .uploads import Source
 from .utils import ExtractionUtils
 from config import settings
 
+cv2 = lazy_import('cv2')
+
+# Per-page OCR results keyed by raster fingerprint. Each worker process has its own memory
+# tier; the disk tier is shared, so boilerplate pages OCR'd by any process are reused.
+page_cache = ResultCache(
+    'pages', max_items=settings.PAGE_CACHE_ITEMS,
+    disk_dir=settings.CACHE_DIR, max_disk_bytes=settings.PAGE_CACHE_MAX_BYTES
+)
+
+# Detected column gutters keyed by page template fingerprint, so later documents
+# of the same form skip preprocessing and gutter detection.
+layout_cache = ResultCache(
+    'layouts', max_items=settings.LAYOUT_CACHE_ITEMS,
+    disk_dir=settings.CACHE_DIR, max_disk_bytes=settings.LAYOUT_CACHE_MAX_BYTES
+)
+
+def _detect_layout(image: np.ndarray, result: PageResult) -> List[float]:
+    start = time.perf_counter()
+    key = ResultCache.make_key('layout', ExtractionUtils.layout_fingerprint(image, settings.LAYOUT_HASH_SIZE))
+    partitions = layout_cache.get(key)
+    result.timings['fingerprint'] = time.perf_counter() - start
+    if partitions is not None:
+        result.cached = True
+        return partitions
+
+    start = time.perf_counter()
+    binary = ExtractionUtils.preprocess_image(image)
+    result.timings['preprocess'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    partitions = ExtractionUtils.detect_gutters(binary, max_gutters=settings.MAX_COLUMNS - 1)
+    result.timings['layout'] = time.perf_counter() - start
+    return layout_cache.set(key, partitions)
+
+def _ocr_page(rendered: RenderedPage, language: str = 'eng', pipeline: Optional[str] = None) -> PageResult:
+    """Preprocess and OCR a single rendered page in memory. Runs inside a PageEngine worker process."""
+    image = rendered.image
+    result = PageResult(page=rendered.page, text="", timings={'render': rendered.render_time})
+
+    # Rendering and preprocessing are deterministic, so the raw raster identifies the page;
+    # hashing before preprocessing lets a hit skip both preprocessing and Tesseract.
+    start = time.perf_counter()
+    pipeline = pipeline or settings.PREPROCESS_PIPELINE
+    key = ResultCache.make_key('ocr-page', ExtractionUtils.image_fingerprint(image), language, pipeline)
+    cached_text = page_cache.get(key)
+    result.timings['fingerprint'] = time.perf_counter() - start
+    if cached_text is not None:
+        result.text, result.cached = cached_text, True
+        return result
+
+    start = time.perf_counter()
+    processed_image, stage_timings = Preprocessor.run(ExtractionUtils.to_grayscale(image), pipeline)
+    result.timings['preprocess'] = time.perf_counter() - start
+    result.timings.update((f"preprocess.{stage}", seconds) for stage, seconds in stage_timings.items())
+
+    start = time.perf_counter()
+    result.text = ExtractionUtils.extract_text_with_tesseract(processed_image, language=language)
+    result.timings['ocr'] = time.perf_counter() - start
+    page_cache.set(key, result.text)
+
+    # The rendered page and the preprocessed page used to be written to disk as JPEGs
+    result.buffer_bytes = image.width * image.height * len(image.getbands()) + processed_image.nbytes
+    return result
+
+def _ocr_page_columns(rendered: RenderedPage, partitions: Optional[Tuple[float, ...]] = None,
+                      language: str = 'eng') -> PageResult:
+    """OCR a page once with word boxes and split the words into columns. Runs inside a PageEngine worker.
+
+    Without ``partitions`` the gutters are detected from the page (or its cached template layout).
+    """
+    image = np.asarray(rendered.image)
+    result = PageResult(page=rendered.page, text="", timings={'render': rendered.render_time})
+    result.partitions = list(partitions) if partitions is not None else _detect_layout(image, result)
+
+    start = time.perf_counter()
+    words = ExtractionUtils.extract_words_with_tesseract(image, language=language)
+    result.timings['ocr'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result.columns = ExtractionUtils.split_words_into_columns(words, image.shape[1], result.partitions)
+    result.text = "\n".join(result.columns)
+    result.timings['columns'] = time.perf_counter() - start
+    result.buffer_bytes = image.nbytes
+    return result
+
+def _ocr_regions(rendered: RenderedPage, template: Template) -> PageResult:
+    """OCR only the template's regions of a rendered page. Runs inside a PageEngine worker.
+
+    Each crop is preprocessed and cached on its own; uncached crops that share a language and
+    psm go through the OCR engine together.
+    """
+    gray = ExtractionUtils.to_grayscale(rendered.image)
+    height, width = gray.shape
+    result = PageResult(page=rendered.page, text="", method='template', fields={},
+                        timings={'render': rendered.render_time})
+    pipeline = template.pipeline or settings.PREPROCESS_PIPELINE
+    pending: Dict[Tuple[str, int], List[Tuple[Region, np.ndarray, str]]] = {}
+    for region in template.regions_on(rendered.page):
+        start = time.perf_counter()
+        left, top, right, bottom = region.pixels(width, height)
+        crop = gray[top:bottom, left:right]
+        key = ResultCache.make_key('ocr-region', ExtractionUtils.image_fingerprint(crop),
+                                   region.language, region.psm, pipeline)
+        cached_text = page_cache.get(key)
+        result.timings['fingerprint'] = result.timings.get('fingerprint', 0.0) + time.perf_counter() - start
+        if cached_text is not None:
+            result.fields[region.name] = cached_text
+            continue
+
+        start = time.perf_counter()
+        processed, _ = Preprocessor.run(crop, pipeline)
+        margin = settings.TEMPLATE_REGION_MARGIN
+        processed = cv2.copyMakeBorder(processed, margin, margin, margin, margin, cv2.BORDER_CONSTANT, value=255)
+        result.timings['preprocess'] = result.timings.get('preprocess', 0.0) + time.perf_counter() - start
+        result.buffer_bytes += crop.nbytes + processed.nbytes
+        pending.setdefault((region.language, region.psm), []).append((region, processed, key))
+
+    start = time.perf_counter()
+    for (language, psm), crops in pending.items():
+        texts = ExtractionUtils.tesseract_outputs([processed for _, processed, _ in crops], language=language,
+                                                  config=f'--oem 3 --psm {psm}')
+        for (region, _, key), text in zip(crops, texts):
+            result.fields[region.name] = page_cache.set(key, text.strip())
+    if pending:
+        result.timings['ocr'] = time.perf_counter() - start
+    result.cached = bool(result.fields) and not pending
+    result.fields = {region.name: result.fields[region.name] for region in template.regions_on(rendered.page)}
+    result.text = "\n".join(result.fields.values())
+    return result
+
+def _document_page(func, item: Tuple[int, Any]) -> Tuple[int, Any]:
+    """Run a page task on a (document index, page) pair; pages that need no work pass through.
+    A page task that raises returns the exception, so the other documents of a batch carry on."""
+    index, page = item
+    if isinstance(page, (PageResult, Exception)):
+        return index, page
+    try:
+        return index, func(page)
+    except Exception as e:
+        return index, e
+
+def _text_layer_shard(item: Tuple[int, Source, Any]) -> Tuple[int, List[Any]]:
+    """Text layer of one run of pages; every shard opens the document on its own.
+    Like ``_document_page``, a failure is returned in place of the shard's results."""
+    index, pdf_path, pages = item
+    if isinstance(pages, Exception):
+        return index, [pages]
+    try:
+        return index, list(PDFExtractor._iter_text_layer(pdf_path, pages=pages))
+    except Exception as e:
+        return index, [e]
+
+def _single_document(results: Iterator[Tuple[int, Any]]) -> Iterator[PageResult]:
+    """Page results of a one-document batch, raising its failure if it has one"""
+    for _, result in results:
+        if isinstance(result, Exception):
+            raise result
+        yield result
+
 class PDFExtractor:
+    @staticmethod
+    def select_pages(pdf_path: Source, page_selection: Optional[PageSelection]) -> Optional[List[int]]:
+        """Page numbers picked by ``page_selection``, or None for the mode's default pages"""
+        if page_selection is None:
+            return None
+        return page_selection.resolve(PageRenderer.document_pages(pdf_path))
+
     @classmethod
-    def extract_text_standard(cls, pdf_path: str) -> str:
-        return ExtractionUtils.extract_pdf_with_plumber(pdf_path)
-
-    @classmethod
-    def extract_excel(cls, file_path: str) -> Dict[str, Any]:
-        return ExtractionUtils.extract_excel_with_pandas(file_path)
-
-    @classmethod
-    def extract_text_ocr(cls, pdf_path: str, language: str = 'eng') -> str:
-        extracted_text = ""
-        
-        # Optimization: Use plumber to get page count fast, don't render images yet
-        with pdfplumber.open(pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-            
-        pages_to_process = min(settings.MAX_PAGES, total_pages)
-        
-        # Convert only the necessary pages
-        images = convert_from_path(pdf_path, first_page=1, last_page=pages_to_process)
-        
-        for image in images:
-            with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as temp_file:
-                image_path = temp_file.name
-                image.save(image_path, "JPEG")
-                
-                processed_image = ExtractionUtils.preprocess_image(image_path)
-                cv2.imwrite(image_path, processed_image)
-                
-                page_text = ExtractionUtils.extract_text_with_tesseract(
-                    image_path, language=language
-                )
-                extracted_text += page_text + "\n"
-                os.unlink(image_path)
-        
-        return extracted_text
-
-    @classmethod
-    def extract_columns(cls, pdf_path: str, left_partition: float = 0.4, right_partition: float = 0.6) -> Tuple[str, str]:
-        # Optimization: Get page count efficiently
-        with pdfplumber.open(pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-
-        pages_to_process = min(settings.MAX_PAGES, total_pages)
-        images = convert_from_path(pdf_path, first_page=1, last_page=pages_to_process)
-        
-        col1_text = ""
-        col2_text = ""
-        
-        for image in images:
-            with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as temp_file:
-                image_path = temp_file.name
-                image.save(image_path, "JPEG")
-                
-                img = cv2.imread(image_path)
-                h, w, _ = img.shape
-                left_cut = int(w * left_partition)
-                right_cut = int(w * right_partition)
-                
-                # Process left column
-                col1_img_path = f"{temp_file.name}_left.jpg"
-                cv2.imwrite(col1_img_path, img[:, :left_cut])
-                col1_text += ExtractionUtils.extract_text_with_tesseract(col1_img_path) + "\n"
-                
-                # Process right column
-                col2_img_path = f"{temp_file.name}_right.jpg"
-                cv2.imwrite(col2_img_path, img[:, left_cut:right_cut])
-                col2_text += ExtractionUtils.extract_text_with_tesseract(col2_img_path) + "\n"
-                
-                # Cleanup
-                for p in [image_path, col1_img_path, col2_img_path]:
-                    if os.path.exists(p): os.unlink(p)
-        
-        return col1_text, col2_text
+    def extract_text_standard(cls, pdf_path: Source, page_selection: Optional[PageSelection] = None) -> str:
+        return "".join(result.text + "\n" for result in cls.iter_pages_standard(pdf_path, page_selection))
+
+    @staticmethod
+    def _iter_text_layer(pdf_path: Source, last_page: Optional[int] = None,
+                         pages: Optional[Sequence[int]] = None) -> Iterator[PageResult]:
+        texts = ExtractionUtils.iter_pages_with_plumber(pdf_path, last_page, pages)
+        numbers = iter(pages) if pages is not None else itertools.count(1)
+        while True:
+            start = time.perf_counter()
+            text = next(texts, None)
+            if text is None:
+                return
+            yield PageResult(page=next(numbers), text=text, method='text',
+                             timings={'text_layer': time.perf_counter() - start})
+
+    @staticmethod
+    def text_shards(pdf_path: Source, pages: Optional[Sequence[int]] = None) -> List[Optional[Tuple[int, ...]]]:
+        """Split ``pages`` (every page when None) into runs of ``settings.TEXT_SHARD_PAGES``.
+
+        A whole document that fits in one shard is a single ``None`` shard, parsed exactly as
+        the serial path parses it.
+        """
+        total = PageRenderer.document_pages(pdf_path)
+        if pages is None:
+            if total <= settings.TEXT_SHARD_PAGES:
+                return [None]
+            pages = range(1, total + 1)
+        numbers = tuple(number for number in pages if number <= total)
+        size = settings.TEXT_SHARD_PAGES
+        return [numbers[start:start + size] for start in range(0, len(numbers), size)]
+
+    @classmethod
+    def _iter_text_shards(cls, pdf_paths: Sequence[Source], pages_of: Callable[[Source], Optional[Sequence[int]]]
+                          ) -> Iterator[Tuple[int, PageResult]]:
+        """(document index, page result) for the text layer of every document.
+
+        pdfminer's layout analysis is CPU bound, so page runs are parsed on the PageEngine
+        pool and merged back in order. A document that fails yields its exception.
+        """
+        def document_shards(index, pdf_path):
+            try:
+                shards = cls.text_shards(pdf_path, pages_of(pdf_path))
+            except Exception as e:
+                shards = [e]
+            return ((index, pdf_path, shard) for shard in shards)
+
+        shards = (shard for index, pdf_path in enumerate(pdf_paths) for shard in document_shards(index, pdf_path))
+        for index, results in PageEngine.map(_text_layer_shard, shards):
+            for result in results:
+                yield index, result
+
+    @classmethod
+    def iter_pages_standard(cls, pdf_path: Source, page_selection: Optional[PageSelection] = None) -> Iterator[PageResult]:
+        results = cls._iter_text_shards([pdf_path], lambda path: cls.select_pages(path, page_selection))
+        return _single_document(results)
+
+    @classmethod
+    def extract_excel(cls, file_path: Source, **selection) -> Dict[str, List[Dict[str, Any]]]:
+        return SheetReader.read(file_path, **selection)
+
+    @classmethod
+    def iter_excel_chunks(cls, file_path: Source, chunk_rows: Optional[int] = None,
+                          **selection) -> Iterator[Tuple[str, int, List[Dict[str, Any]]]]:
+        return SheetReader.iter_chunks(file_path, chunk_rows or settings.EXCEL_CHUNK_ROWS, **selection)
+
+    @classmethod
+    def extract_excel_table(cls, file_path: Source, fmt: str, **selection) -> Tuple[str, bytes]:
+        """The first selected sheet encoded as an Arrow IPC stream or Parquet file, with its name"""
+        chunks = SheetReader.iter_chunks(file_path, settings.EXCEL_CHUNK_ROWS, empty=None, **selection)
+        try:
+            first = next(chunks, None)  # every selected sheet yields at least one batch
+            if first is None:
+                raise ValueError("Workbook has no sheets")
+            sheet = first[0]
+            rest = itertools.takewhile(lambda chunk: chunk[0] == sheet, chunks)
+            table = ColumnarEncoder.table(itertools.chain([first[2]], (records for _, _, records in rest)))
+        finally:
+            chunks.close()
+        return sheet, ColumnarEncoder.encode(table, fmt)
+
+    @staticmethod
+    def _map_pages(func, pages: Iterator[RenderedPage], deadline: Optional[Deadline] = None) -> Iterator[PageResult]:
+        # Render lazily and process pages concurrently; results come back in page order.
+        # Rendered pixels in flight stay under the budget, whatever the page count.
+        return PageEngine.map(func, pages, cost=lambda rendered: rendered.pixels,
+                              max_cost=settings.RENDER_PIXEL_BUDGET, deadline=deadline)
+
+    @classmethod
+    def iter_pages_ocr(cls, pdf_path: Source, language: str = 'eng', pipeline: Optional[str] = None,
+                       page_selection: Optional[PageSelection] = None,
+                       deadline: Optional[Deadline] = None) -> Iterator[PageResult]:
+        """OCR the selected pages. With a ``deadline``, pages stop being scheduled once the time
+        budget is nearly spent; ``deadline.reached`` then tells the caller the result is partial."""
+        pages = PageRenderer.iter_pages(
+            pdf_path, last_page=settings.MAX_PAGES, pages=cls.select_pages(pdf_path, page_selection)
+        )
+        return cls._map_pages(partial(_ocr_page, language=language, pipeline=pipeline), pages, deadline)
+
+    @classmethod
+    def extract_pages_ocr(cls, pdf_path: Source, language: str = 'eng', pipeline: Optional[str] = None,
+                          page_selection: Optional[PageSelection] = None,
+                          deadline: Optional[Deadline] = None) -> List[PageResult]:
+        return list(cls.iter_pages_ocr(pdf_path, language=language, pipeline=pipeline,
+                                       page_selection=page_selection, deadline=deadline))
+
+    @classmethod
+    def iter_pages_hybrid(cls, pdf_path: Source, language: str = 'eng', pipeline: Optional[str] = None,
+                          page_selection: Optional[PageSelection] = None,
+                          deadline: Optional[Deadline] = None) -> Iterator[PageResult]:
+        """Use the embedded text layer where it is usable and OCR only the remaining pages"""
+        results = cls.iter_batch('hybrid', [pdf_path], deadline=deadline, language=language, pipeline=pipeline,
+                                 page_selection=page_selection)
+        return _single_document(results)
+
+    @classmethod
+    def _iter_hybrid_items(cls, pdf_paths: Sequence[Source],
+                           page_selection: Optional[PageSelection] = None) -> Iterator[Tuple[int, Any]]:
+        """(document index, page) for every page: text-layer results as they are, rendered pages to OCR.
+        A document that fails yields its exception."""
+        for index, pdf_path in enumerate(pdf_paths):
+            try:
+                pages = cls.select_pages(pdf_path, page_selection)
+                if pages is None:
+                    pages = range(1, settings.MAX_PAGES + 1)
+                results = list(_single_document(cls._iter_text_shards([pdf_path], lambda path: pages)))
+                ocr_pages = [
+                    result.page for result in results
+                    if not ExtractionUtils.is_usable_text_layer(result.text, min_chars=settings.HYBRID_MIN_CHARS)
+                ]
+                rendered = PageRenderer.iter_pages(pdf_path, pages=ocr_pages) if ocr_pages else iter(())
+                ocr_set = set(ocr_pages)
+                for result in results:
+                    yield index, next(rendered) if result.page in ocr_set else result
+            except Exception as e:
+                yield index, e
+
+    @classmethod
+    def iter_batch(cls, mode: str, pdf_paths: Sequence[Source], deadline: Optional[Deadline] = None,
+                   **params) -> Iterator[Tuple[int, Any]]:
+        """Extract several documents through a single PageEngine queue.
+
+        Pages of every document share one ``PageEngine.map`` call, so the pool stays busy across
+        file boundaries (the next file renders while the last pages of the previous one are OCR'd)
+        instead of filling and draining once per file. ``standard`` documents are parsed in
+        shards of ``settings.TEXT_SHARD_PAGES`` pages per pool task. Yields (document index, page result); documents and pages come back in order.
+        A document that cannot be read or whose page task raises yields the exception in place of
+        those pages; the other documents are still extracted.
+        """
+        page_selection = params.get('page_selection')
+        if mode == 'standard':
+            yield from cls._iter_text_shards(pdf_paths, lambda path: cls.select_pages(path, page_selection))
+            return
+        if mode == 'columns':
+            partitions = params.get('partitions')
+            func = partial(_ocr_page_columns, partitions=tuple(partitions) if partitions is not None else None,
+                           language=params.get('language', 'eng'))
+        elif mode in ('ocr', 'hybrid'):
+            func = partial(_ocr_page, language=params.get('language', 'eng'), pipeline=params.get('pipeline'))
+        elif mode == 'template':
+            func = partial(_ocr_regions, template=params['template'])
+        else:
+            raise ValueError(f"Batch extraction does not support mode: {mode}")
+
+        if mode == 'hybrid':
+            items = cls._iter_hybrid_items(pdf_paths, page_selection)
+        else:
+            if mode == 'template':
+                pages_of = lambda path: cls.template_pages(path, params['template'], page_selection)
+            else:
+                pages_of = lambda path: cls.select_pages(path, page_selection)
+
+            def document_items(index, pdf_path):
+                try:
+                    for rendered in PageRenderer.iter_pages(pdf_path, last_page=settings.MAX_PAGES,
+                                                            pages=pages_of(pdf_path)):
+                        yield index, rendered
+                except Exception as e:
+                    yield index, e
+
+            items = (item for index, pdf_path in enumerate(pdf_paths) for item in document_items(index, pdf_path))
+        pixels = lambda item: item[1].pixels if isinstance(item[1], RenderedPage) else 0
+        yield from PageEngine.map(partial(_document_page, func), items, cost=pixels,
+                                  max_cost=settings.RENDER_PIXEL_BUDGET, deadline=deadline)
+
+    @classmethod
+    def template_pages(cls, pdf_path: Source, template: Template,
+                       page_selection: Optional[PageSelection] = None) -> Optional[List[int]]:
+        """Selected pages that carry template regions; None for the default pages"""
+        selected = cls.select_pages(pdf_path, page_selection)
+        pages = template.pages()
+        if pages is None:
+            return selected
+        return [page for page in pages if selected is None or page in selected][:settings.MAX_PAGES]
+
+    @classmethod
+    def iter_pages_template(cls, pdf_path: Source, template: Template, page_selection: Optional[PageSelection] = None,
+                            deadline: Optional[Deadline] = None) -> Iterator[PageResult]:
+        """OCR only the regions of a registered form template; pages without regions are not rendered"""
+        pages = PageRenderer.iter_pages(
+            pdf_path, last_page=settings.MAX_PAGES, pages=cls.template_pages(pdf_path, template, page_selection)
+        )
+        return cls._map_pages(partial(_ocr_regions, template=template), pages, deadline)
+
+    @classmethod
+    def extract_pages_hybrid(cls, pdf_path: Source, language: str = 'eng', pipeline: Optional[str] = None,
+                             page_selection: Optional[PageSelection] = None,
+                             deadline: Optional[Deadline] = None) -> List[PageResult]:
+        return list(cls.iter_pages_hybrid(pdf_path, language=language, pipeline=pipeline,
+                                          page_selection=page_selection, deadline=deadline))
+
+    @classmethod
+    def extract_text_ocr(cls, pdf_path: Source, language: str = 'eng', pipeline: Optional[str] = None,
+                         page_selection: Optional[PageSelection] = None, deadline: Optional[Deadline] = None) -> str:
+        results = cls.iter_pages_ocr(pdf_path, language=language, pipeline=pipeline,
+                                     page_selection=page_selection, deadline=deadline)
+        return "".join(result.text + "\n" for result in results)
+
+    @classmethod
+    def iter_pages_columns(cls, pdf_path: Source, partitions: Optional[Sequence[float]] = None,
+                           language: str = 'eng', page_selection: Optional[PageSelection] = None,
+                           deadline: Optional[Deadline] = None) -> Iterator[PageResult]:
+        """Per-page column split. ``partitions`` are column boundaries as fractions of the page width;
+        None detects the gutters of each page automatically."""
+        pages = PageRenderer.iter_pages(
+            pdf_path, last_page=settings.MAX_PAGES, pages=cls.select_pages(pdf_path, page_selection)
+        )
+        return cls._map_pages(
+            partial(_ocr_page_columns, partitions=tuple(partitions) if partitions is not None else None,
+                    language=language), pages, deadline,
+        )
+
+    @classmethod
+    def extract_pages_columns(cls, pdf_path: Source, partitions: Optional[Sequence[float]] = None,
+                              language: str = 'eng', page_selection: Optional[PageSelection] = None,
+                              deadline: Optional[Deadline] = None) -> List[PageResult]:
+        return list(cls.iter_pages_columns(pdf_path, partitions=partitions, language=language,
+                                           page_selection=page_selection, deadline=deadline))
+
+    @classmethod
+    def extract_columns(cls, pdf_path: Source, partitions: Optional[Sequence[float]] = (0.4, 0.6),
+                        language: str = 'eng') -> List[str]:
+        """Split every page into columns and return the text of each column.
+
+        ``partitions`` are column boundaries as fractions of the page width (None = detect).
+        Each page is OCR'd once; words are assigned to columns by position.
+        """
+        return cls.join_columns(cls.extract_pages_columns(pdf_path, partitions=partitions, language=language))
+
+    @staticmethod
+    def join_columns(page_results: List[PageResult]) -> List[str]:
+        """Concatenate per-page columns; pages with fewer columns contribute empty lines"""
+        column_count = max((len(result.columns) for result in page_results), default=0)
+        return [
+            "".join((result.columns[index] if index < len(result.columns) else "") + "\n" for result in page_results)
+            for index in range(column_count)
+        ]
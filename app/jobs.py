@@ -0,0 +1,164 @@
+"""Background extraction jobs with a bounded priority queue"""
+import itertools
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+class JobCancelled(Exception):
+    pass
+
+class JobManager:
+    """Runs extraction callables on local worker threads.
+
+    Heavy work still goes to the shared PageEngine process pool; the threads only keep
+    gunicorn's request workers free. Job state is persisted as JSON under ``job_dir`` so any
+    gunicorn worker can report status, return results or cancel a job (via a marker file the
+    owning worker checks between pages). Lower ``priority`` values run first.
+    """
+
+    STATES = ('queued', 'running', 'done', 'failed', 'cancelled')
+
+    def __init__(self, job_dir: str, workers: int = 2, max_queue: int = 32, ttl: int = 3600):
+        self.job_dir = job_dir
+        self.workers = workers
+        self.ttl = ttl
+        self._queue = queue.PriorityQueue(maxsize=max_queue)
+        self._sequence = itertools.count()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable[[Callable[[int, int], None]], Any], mode: str, filename: str = None,
+               priority: int = 5, cleanup: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+        """Queue ``func(progress)``; raises ``queue.Full`` when the queue is at capacity.
+
+        ``func`` receives a ``progress(page, total)`` callback to call after each page;
+        the callback raises ``JobCancelled`` once the job has been cancelled.
+        """
+        self._start()
+        self._purge_expired()
+        record = {
+            "job_id": uuid.uuid4().hex, "mode": mode, "filename": filename, "priority": priority,
+            "status": "queued", "pages_done": 0, "pages_total": None, "completed_pages": [],
+            "error": None, "created": time.time(), "started": None, "finished": None,
+        }
+        self._save(record)
+        try:
+            self._queue.put_nowait((priority, next(self._sequence), record["job_id"], func, cleanup))
+        except queue.Full:
+            self._delete(record["job_id"])
+            raise
+        return record
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._load(self._path(job_id, 'json'))
+
+    def result(self, job_id: str) -> Optional[Any]:
+        return self._load(self._path(job_id, 'result.json'))
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        record = self.get(job_id)
+        if record is None:
+            return None
+        if record["status"] in ('queued', 'running'):
+            open(self._path(job_id, 'cancel'), 'w').close()
+            if record["status"] == 'queued':
+                record.update(status='cancelled', finished=time.time())
+                self._save(record)
+        return record
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _start(self) -> None:
+        # Threads are started lazily so they belong to the gunicorn worker, not the pre-fork master
+        with self._lock:
+            if not self._threads:
+                os.makedirs(self.job_dir, exist_ok=True)
+                for _ in range(self.workers):
+                    thread = threading.Thread(target=self._work, daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+
+    def _work(self) -> None:
+        while True:
+            _, _, job_id, func, cleanup = self._queue.get()
+            try:
+                self._run(job_id, func)
+            finally:
+                if cleanup:
+                    cleanup()
+                self._queue.task_done()
+
+    def _run(self, job_id: str, func: Callable) -> None:
+        record = self.get(job_id)
+        if record is None or self._cancelled(job_id):
+            if record is not None:
+                record.update(status='cancelled', finished=record["finished"] or time.time())
+                self._save(record)
+            return
+        record.update(status='running', started=time.time())
+        self._save(record)
+
+        def progress(page: int, total: int) -> None:
+            if self._cancelled(job_id):
+                raise JobCancelled()
+            record["completed_pages"].append(page)
+            record.update(pages_done=len(record["completed_pages"]), pages_total=total)
+            self._save(record)
+
+        try:
+            result = func(progress)
+            self._write(self._path(job_id, 'result.json'), json.dumps(result, default=str))
+            record.update(status='done')
+        except JobCancelled:
+            record.update(status='cancelled')
+        except Exception as e:
+            record.update(status='failed', error=str(e))
+        record["finished"] = time.time()
+        self._save(record)
+
+    def _cancelled(self, job_id: str) -> bool:
+        return os.path.exists(self._path(job_id, 'cancel'))
+
+    def _path(self, job_id: str, suffix: str) -> str:
+        return os.path.join(self.job_dir, f"{os.path.basename(job_id)}.{suffix}")
+
+    def _save(self, record: Dict[str, Any]) -> None:
+        self._write(self._path(record["job_id"], 'json'), json.dumps(record))
+
+    def _write(self, path: str, payload: str) -> None:
+        os.makedirs(self.job_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.job_dir, suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _load(path: str) -> Optional[Any]:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _delete(self, job_id: str) -> None:
+        for suffix in ('json', 'result.json', 'cancel'):
+            try:
+                os.unlink(self._path(job_id, suffix))
+            except OSError:
+                pass
+
+    def _purge_expired(self) -> None:
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.job_dir):
+            path = os.path.join(self.job_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+            except OSError:
+                continue
@@ -0,0 +1,55 @@
+"""Deferred imports for the heavy extraction engines"""
+import importlib
+import importlib.util
+import threading
+from types import ModuleType
+from typing import Any, Dict, Optional
+
+class LazyModule:
+    """Stands in for a module that is imported on first attribute access.
+
+    The import runs under a lock, so request and job threads touching an engine for the first
+    time at once all wait for one complete import (``importlib.util.LazyLoader`` is not
+    thread-safe and hands the losers a half-initialized module).
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name!r}{' (loaded)' if self._module is not None else ''}>"
+
+_lazy_modules: Dict[str, LazyModule] = {}
+_lazy_modules_lock = threading.Lock()
+
+def lazy_import(name: str, optional: bool = False) -> Optional[LazyModule]:
+    """``name`` as a module whose code only runs on first attribute access.
+
+    Importing pandas, OpenCV, pdfplumber and friends costs most of a worker's boot time, and an
+    endpoint that never touches one should not pay for it. A module that is not installed raises
+    ImportError here, or returns None when ``optional``.
+    """
+    with _lazy_modules_lock:
+        if name not in _lazy_modules:
+            if importlib.util.find_spec(name) is None:
+                if optional:
+                    return None
+                raise ImportError(f"No module named '{name}'", name=name)
+            _lazy_modules[name] = LazyModule(name)
+        return _lazy_modules[name]
+
+def load(name: str) -> ModuleType:
+    """Import ``name`` now (e.g. before forking workers)"""
+    return lazy_import(name)._load()
@@ -0,0 +1,208 @@
+"""Request/page stage timings and Prometheus text exposition"""
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List
+from config import settings
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+DEFINITIONS = {
+    "dataxtractor_request_seconds": ("histogram", "Extraction request duration by mode and status"),
+    "dataxtractor_stage_seconds": ("histogram", "Time spent per request stage (upload, extract, serialize) or page stage (render, preprocess, ocr, ...)"),
+    "dataxtractor_requests_total": ("counter", "Extraction requests by mode and status"),
+    "dataxtractor_pages_total": ("counter", "Pages processed by mode and method"),
+    "dataxtractor_page_cache_hits_total": ("counter", "Pages served from the page/layout cache"),
+    "dataxtractor_page_buffer_bytes_total": ("counter", "Page image bytes handed between stages in memory instead of via temp files"),
+    "dataxtractor_result_cache_total": ("counter", "Whole-document result cache lookups by outcome"),
+    "dataxtractor_job_queue_depth": ("gauge", "Background jobs waiting to run"),
+    "dataxtractor_admission_slots_in_use": ("gauge", "OCR admission slots currently held"),
+    "dataxtractor_admission_rejected_total": ("counter", "Requests turned away with 429 because every OCR slot was taken"),
+    "dataxtractor_pages_per_second": ("gauge", "Pages completed per second over the last minute"),
+}
+
+def _label_key(labels: Dict[str, Any]) -> str:
+    return json.dumps(sorted((name, str(value)) for name, value in labels.items()))
+
+class Metrics:
+    """Process-local counters, histograms and gauges.
+
+    Every gunicorn worker keeps its own values and writes a snapshot to ``metrics_dir``;
+    ``render()`` merges the snapshots of all workers so one scrape covers the whole service.
+    Gauges of workers that have exited are dropped, counters and histograms are kept.
+    """
+
+    def __init__(self, metrics_dir: str = None):
+        self.metrics_dir = metrics_dir
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: defaultdict(float))
+        self._histograms = defaultdict(dict)
+        self._gauges: Dict[str, Callable[[], float]] = {}
+        self._page_times = deque()
+
+    def inc(self, name: str, amount: float = 1.0, **labels) -> None:
+        with self._lock:
+            self._counters[name][_label_key(labels)] += amount
+
+    def set_counter(self, name: str, value: float, **labels) -> None:
+        """Mirror an externally maintained counter (e.g. cache hit counts)"""
+        with self._lock:
+            self._counters[name][_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            series = self._histograms[name].setdefault(_label_key(labels), [0] * len(BUCKETS) + [0.0, 0])
+            for index, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def gauge(self, name: str, func: Callable[[], float]) -> None:
+        self._gauges[name] = func
+
+    def page_done(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._page_times.append(now)
+
+    def pages_per_second(self, window: float = 60.0) -> float:
+        cutoff = time.monotonic() - window
+        with self._lock:
+            while self._page_times and self._page_times[0] < cutoff:
+                self._page_times.popleft()
+            return len(self._page_times) / window
+
+    def snapshot(self) -> Dict[str, Any]:
+        gauges = {name: {_label_key({}): float(func())} for name, func in self._gauges.items()}
+        gauges["dataxtractor_pages_per_second"] = {_label_key({}): self.pages_per_second()}
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "counters": {name: dict(series) for name, series in self._counters.items()},
+                "histograms": {name: {key: list(values) for key, values in series.items()}
+                               for name, series in self._histograms.items()},
+                "gauges": gauges,
+            }
+
+    def flush(self) -> None:
+        if not self.metrics_dir:
+            return
+        try:
+            os.makedirs(self.metrics_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.metrics_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, os.path.join(self.metrics_dir, f"{os.getpid()}.json"))
+        except OSError:
+            pass
+
+    def _snapshots(self) -> List[Dict[str, Any]]:
+        if not self.metrics_dir:
+            return [self.snapshot()]
+        self.flush()
+        snapshots = []
+        for name in os.listdir(self.metrics_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.metrics_dir, name)) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    @staticmethod
+    def _alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4) summed over all workers"""
+        counters = defaultdict(lambda: defaultdict(float))
+        gauges = defaultdict(lambda: defaultdict(float))
+        histograms = defaultdict(dict)
+        for snapshot in self._snapshots():
+            for name, series in snapshot["counters"].items():
+                for key, value in series.items():
+                    counters[name][key] += value
+            for name, series in snapshot["histograms"].items():
+                for key, values in series.items():
+                    merged = histograms[name].setdefault(key, [0] * len(values))
+                    histograms[name][key] = [a + b for a, b in zip(merged, values)]
+            if self._alive(snapshot["pid"]):
+                for name, series in snapshot["gauges"].items():
+                    for key, value in series.items():
+                        gauges[name][key] += value
+
+        lines = []
+        for name, (kind, help_text) in DEFINITIONS.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            if kind == "histogram":
+                for key, values in sorted(histograms.get(name, {}).items()):
+                    labels = json.loads(key)
+                    for bound, count in zip(BUCKETS, values):
+                        lines.append(f"{name}_bucket{_format(labels + [['le', repr(bound)]])} {count}")
+                    lines.append(f"{name}_bucket{_format(labels + [['le', '+Inf']])} {values[-1]}")
+                    lines.append(f"{name}_sum{_format(labels)} {values[-2]}")
+                    lines.append(f"{name}_count{_format(labels)} {values[-1]}")
+            else:
+                source = counters if kind == "counter" else gauges
+                for key, value in sorted(source.get(name, {}).items()):
+                    lines.append(f"{name}{_format(json.loads(key))} {value}")
+        return "\n".join(lines) + "\n"
+
+def _format(labels: List[List[str]]) -> str:
+    if not labels:
+        return ""
+    escaped = ('{}="{}"'.format(name, value.replace("\\", "\\\\").replace('"', '\\"')) for name, value in labels)
+    return "{" + ",".join(escaped) + "}"
+
+metrics = Metrics(settings.METRICS_DIR)
+
+class RequestMetrics:
+    """Stage timings for one extraction request; also feeds the service-wide histograms"""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.pages: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+            metrics.observe("dataxtractor_stage_seconds", time.perf_counter() - start, mode=self.mode, stage=name)
+
+    def page(self, result) -> None:
+        """Record a finished PageResult (use as the ``on_page`` callback)"""
+        self.pages.append(dict(result.timings, page=result.page, method=result.method, cached=result.cached,
+                               buffer_bytes=result.buffer_bytes))
+        for stage, seconds in result.timings.items():
+            metrics.observe("dataxtractor_stage_seconds", seconds, mode=self.mode, stage=stage)
+        metrics.inc("dataxtractor_pages_total", mode=self.mode, method=result.method)
+        if result.cached:
+            metrics.inc("dataxtractor_page_cache_hits_total", mode=self.mode)
+        metrics.inc("dataxtractor_page_buffer_bytes_total", result.buffer_bytes, mode=self.mode)
+        metrics.page_done()
+
+    def report(self) -> Dict[str, Any]:
+        return {"total": time.perf_counter() - self.started, "stages": dict(self.stages), "pages": self.pages}
+
+    def finish(self, status: str) -> None:
+        metrics.observe("dataxtractor_request_seconds", time.perf_counter() - self.started, mode=self.mode, status=status)
+        metrics.inc("dataxtractor_requests_total", mode=self.mode, status=status)
+        metrics.flush()
@@ -0,0 +1,172 @@
+"""Warm Tesseract engines reused across pages and requests"""
+import os
+import shlex
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from .lazy import lazy_import
+from config import settings
+
+# Tesseract's OpenMP pool would otherwise start a thread per core in every OCR process. It reads
+# the limit when the library loads, so it is set before tesserocr is imported (and is inherited
+# by tesseract subprocesses and page engine workers).
+os.environ.setdefault('OMP_THREAD_LIMIT', str(settings.OCR_THREADS))
+
+cv2 = lazy_import('cv2')
+
+# Imported eagerly: tesserocr installs signal handlers when it loads, which only works on the main
+# thread, and a lazy first use would come from a request or job thread.
+try:
+    import tesserocr
+except (ImportError, ValueError):  # optional: fall back to one tesseract subprocess per call
+    tesserocr = None
+
+EngineKey = Tuple[str, int, int, Tuple[Tuple[str, str], ...]]
+
+class TesseractPool:
+    """Process-local pool of initialized ``tesserocr`` engines.
+
+    Engines are keyed by language combination, ``--oem``/``--psm`` and any ``-c`` variables,
+    so the traineddata is loaded once per key instead of once per page. PageEngine workers are
+    long-lived, so their pools stay warm across requests. At most ``settings.TESSERACT_POOL_SIZE``
+    idle engines are kept per process; the least recently used are closed first.
+    """
+    _idle: "OrderedDict[EngineKey, List]" = OrderedDict()
+    _idle_count = 0
+    _failed_keys = set()  # keys tesserocr could not initialize (e.g. traineddata missing on its path)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        return tesserocr is not None
+
+    @staticmethod
+    def parse_config(language: str, config: str) -> Optional[EngineKey]:
+        """Map a tesseract CLI config string to an engine key, or None if it needs the CLI"""
+        oem, psm, variables = 3, 3, {}
+        tokens = shlex.split(config)
+        try:
+            while tokens:
+                token = tokens.pop(0)
+                if token == '--oem':
+                    oem = int(tokens.pop(0))
+                elif token == '--psm':
+                    psm = int(tokens.pop(0))
+                elif token == '--dpi':
+                    variables['user_defined_dpi'] = tokens.pop(0)
+                elif token == '-c':
+                    name, value = tokens.pop(0).split('=', 1)
+                    variables[name] = value
+                else:
+                    return None
+        except (IndexError, ValueError):
+            return None
+        return language, oem, psm, tuple(sorted(variables.items()))
+
+    @classmethod
+    @contextmanager
+    def engine(cls, key: EngineKey) -> Iterator["tesserocr.PyTessBaseAPI"]:
+        api = None
+        with cls._lock:
+            idle = cls._idle.get(key)
+            if idle:
+                api = idle.pop()
+                cls._idle_count -= 1
+                cls._idle.move_to_end(key)
+        if api is None:
+            language, oem, psm, variables = key
+            api = tesserocr.PyTessBaseAPI(lang=language, oem=oem, psm=psm)
+            for name, value in variables:
+                api.SetVariable(name, value)
+        try:
+            yield api
+        finally:
+            api.Clear()
+            cls._release(key, api)
+
+    @classmethod
+    def _release(cls, key: EngineKey, api) -> None:
+        with cls._lock:
+            cls._idle.setdefault(key, []).append(api)
+            cls._idle.move_to_end(key)
+            cls._idle_count += 1
+            while cls._idle_count > settings.TESSERACT_POOL_SIZE:
+                oldest_key, oldest = next(iter(cls._idle.items()))
+                oldest.pop(0).End()
+                cls._idle_count -= 1
+                if not oldest:
+                    del cls._idle[oldest_key]
+
+    @staticmethod
+    def _set_image(api, image: np.ndarray) -> None:
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        bytes_per_pixel = 1 if image.ndim == 2 else image.shape[2]
+        api.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+
+    @classmethod
+    def run(cls, image: np.ndarray, language: str = 'eng', config: str = '', output: str = 'txt') -> Optional[str]:
+        """OCR an in-memory image on a warm engine. ``output`` is ``'txt'`` or ``'tsv'``.
+
+        Returns None when tesserocr is not installed or the config needs the CLI, so the
+        caller can fall back to a tesseract subprocess.
+        """
+        key = cls.parse_config(language, config) if cls.available() else None
+        if key is None or key in cls._failed_keys:
+            return None
+        try:
+            with cls.engine(key) as api:
+                cls._set_image(api, image)
+                return api.GetTSVText(0) if output == 'tsv' else api.GetUTF8Text()
+        except RuntimeError:
+            # PyTessBaseAPI raises RuntimeError when initialization fails; don't retry this key
+            cls._failed_keys.add(key)
+            return None
+
+    @classmethod
+    def run_many(cls, images: Sequence[np.ndarray], language: str = 'eng', config: str = '',
+                 output: str = 'txt') -> Optional[List[str]]:
+        """OCR several images (e.g. the fields of one form page) on a single warm engine.
+
+        Returns None under the same conditions as ``run``.
+        """
+        key = cls.parse_config(language, config) if cls.available() else None
+        if key is None or key in cls._failed_keys:
+            return None
+        try:
+            with cls.engine(key) as api:
+                texts = []
+                for image in images:
+                    cls._set_image(api, image)
+                    texts.append(api.GetTSVText(0) if output == 'tsv' else api.GetUTF8Text())
+                return texts
+        except RuntimeError:
+            cls._failed_keys.add(key)
+            return None
+
+    @classmethod
+    def warm(cls, language: str = 'eng', config: str = '--oem 3 --psm 6') -> bool:
+        """Initialize an engine ahead of the first request; returns False if tesserocr is unavailable"""
+        key = cls.parse_config(language, config) if cls.available() else None
+        if key is None or key in cls._failed_keys:
+            return False
+        try:
+            with cls.engine(key):
+                pass
+        except RuntimeError:
+            cls._failed_keys.add(key)
+            return False
+        return True
+
+    @classmethod
+    def close(cls) -> None:
+        with cls._lock:
+            for engines in cls._idle.values():
+                for api in engines:
+                    api.End()
+            cls._idle.clear()
+            cls._idle_count = 0
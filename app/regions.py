@@ -0,0 +1,120 @@
+"""Form templates: named page regions that are OCR'd instead of the whole page"""
+import json
+import math
+import os
+import re
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from .preprocessing import Preprocessor
+from config import settings
+
+@dataclass(frozen=True)
+class Region:
+    """One field of a form. ``box`` is (left, top, right, bottom) as fractions of the page size,
+    so a template works at any render DPI. ``page`` is the 1-based page the field is on, or None
+    for every page; ``psm`` is the Tesseract page segmentation mode (7: a single line of text)."""
+    name: str
+    box: Tuple[float, float, float, float]
+    page: Optional[int] = 1
+    language: str = 'eng'
+    psm: int = 7
+
+    def pixels(self, width: int, height: int) -> Tuple[int, int, int, int]:
+        """The box in pixels of a ``width`` x ``height`` page, rounded outwards"""
+        left, top, right, bottom = self.box
+        return (int(left * width), int(top * height),
+                min(width, math.ceil(right * width)), min(height, math.ceil(bottom * height)))
+
+@dataclass(frozen=True)
+class Template:
+    """A named set of regions plus the preprocessing pipeline applied to each crop"""
+    name: str
+    regions: Tuple[Region, ...]
+    pipeline: Optional[str] = None
+
+    def regions_on(self, page: int) -> List[Region]:
+        return [region for region in self.regions if region.page is None or region.page == page]
+
+    def pages(self) -> Optional[List[int]]:
+        """Pages that carry regions, or None when some region applies to every page"""
+        if any(region.page is None for region in self.regions):
+            return None
+        return sorted({region.page for region in self.regions})
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any]) -> "Template":
+        """Validate a template definition (``{"regions": [...], "pipeline": ...}``); raises ValueError"""
+        if not re.fullmatch(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,63}", name or ""):
+            raise ValueError("Template names are 1-64 letters, digits, '_', '.' or '-'")
+        regions = data.get('regions') if isinstance(data, dict) else None
+        if not regions or not isinstance(regions, list):
+            raise ValueError("A template needs a non-empty list of regions")
+        if len(regions) > settings.TEMPLATE_MAX_REGIONS:
+            raise ValueError(f"A template has at most {settings.TEMPLATE_MAX_REGIONS} regions")
+        parsed = []
+        for region in regions:
+            try:
+                box = tuple(float(value) for value in region['box'])
+                page = region.get('page', 1)
+                parsed.append(Region(
+                    name=str(region['name']), box=box, page=int(page) if page is not None else None,
+                    language=str(region.get('language', 'eng')), psm=int(region.get('psm', 7)),
+                ))
+            except (KeyError, TypeError, ValueError, AttributeError):
+                raise ValueError("Each region needs a name and a box of four page fractions")
+        for region in parsed:
+            left, top, right, bottom = region.box if len(region.box) == 4 else (0, 0, 0, 0)
+            if not (0 <= left < right <= 1 and 0 <= top < bottom <= 1):
+                raise ValueError(f"Region {region.name}: box must be (left, top, right, bottom) fractions of the page")
+            if region.page is not None and region.page < 1:
+                raise ValueError(f"Region {region.name}: page must be 1-based")
+            if not 0 <= region.psm <= 13:
+                raise ValueError(f"Region {region.name}: psm must be between 0 and 13")
+        if len({region.name for region in parsed}) != len(parsed):
+            raise ValueError("Region names must be unique")
+        pipeline = data.get('pipeline') or None
+        if pipeline and pipeline != 'auto':
+            Preprocessor.resolve(pipeline)
+        return cls(name=name, regions=tuple(parsed), pipeline=pipeline)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+class TemplateRegistry:
+    """Templates stored as one JSON file each under ``template_dir``, shared by every web worker"""
+
+    def __init__(self, template_dir: str):
+        self.template_dir = template_dir
+
+    def get(self, name: str) -> Optional[Template]:
+        try:
+            with open(self._path(name)) as f:
+                return Template.from_dict(name, json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def list(self) -> List[Template]:
+        if not os.path.isdir(self.template_dir):
+            return []
+        names = sorted(name[:-len('.json')] for name in os.listdir(self.template_dir) if name.endswith('.json'))
+        return [template for template in map(self.get, names) if template is not None]
+
+    def save(self, template: Template) -> Template:
+        os.makedirs(self.template_dir, exist_ok=True)
+        payload = {key: value for key, value in template.to_dict().items() if key != 'name'}
+        fd, tmp_path = tempfile.mkstemp(dir=self.template_dir, suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self._path(template.name))
+        return template
+
+    def delete(self, name: str) -> bool:
+        try:
+            os.unlink(self._path(name))
+            return True
+        except OSError:
+            return False
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.template_dir, f"{os.path.basename(name)}.json")
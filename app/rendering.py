@@ -0,0 +1,198 @@
+"""Streaming page renderer"""
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from PIL import Image
+from .lazy import lazy_import
+from .uploads import DocumentSource, Source
+from config import settings
+
+pdf2image = lazy_import('pdf2image')
+pdfplumber = lazy_import('pdfplumber')
+pdftypes = lazy_import('pdfminer.pdftypes')
+
+@dataclass
+class RenderedPage:
+    page: int
+    image: Image.Image
+    render_time: float = 0.0
+    dpi: int = 0
+
+    @property
+    def pixels(self) -> int:
+        return self.image.width * self.image.height
+
+@dataclass(frozen=True)
+class PageSelection:
+    """Pages a client asked for: explicit ``pages``, a ``first_page``..``last_page`` range
+    and/or an evenly spread ``sample`` of that many pages (a preview)"""
+    pages: Optional[Tuple[int, ...]] = None
+    first_page: Optional[int] = None
+    last_page: Optional[int] = None
+    sample: Optional[int] = None
+
+    def resolve(self, total: int) -> List[int]:
+        """Sorted 1-based page numbers that exist in a ``total``-page document, at most ``settings.MAX_PAGES``"""
+        first = max(self.first_page or 1, 1)
+        last = min(self.last_page or total, total)
+        if self.pages is not None:
+            numbers = sorted({number for number in self.pages if first <= number <= last})
+        else:
+            numbers = list(range(first, last + 1))
+        if self.sample and len(numbers) > self.sample:
+            step = (len(numbers) - 1) / max(self.sample - 1, 1)
+            numbers = sorted({numbers[round(index * step)] for index in range(self.sample)})
+        return numbers[:settings.MAX_PAGES]
+
+class PageRenderer:
+    """Renders pages lazily through poppler's grayscale (PGM) output.
+
+    Pages are rendered in small windows, one pdftoppm call per window, so only the
+    window being rendered plus whatever the consumer still holds is resident. A window
+    never exceeds ``settings.RENDER_WINDOW_PAGES`` pages or ``settings.RENDER_PIXEL_BUDGET``
+    pixels (a single oversized page is still rendered on its own).
+
+    Each page gets its own DPI: a quick ``settings.RENDER_PROBE_DPI`` render measures the height
+    of its text lines, and the DPI is chosen so that text reaches ``settings.RENDER_TEXT_HEIGHT_PX``.
+    Whatever the DPI, no page is rendered larger than ``settings.RENDER_MAX_PAGE_PIXELS``.
+    """
+
+    @staticmethod
+    def page_sizes(pdf_path: Source, pages: Optional[Sequence[int]] = None) -> Dict[int, Tuple[float, float]]:
+        """Page (width, height) in PDF points by page number, for ``pages`` or every page.
+
+        Only the listed pages are turned into pdfplumber pages.
+        """
+        with pdfplumber.open(DocumentSource.open(pdf_path), pages=list(pages) if pages is not None else None) as pdf:
+            return {page.page_number: (float(page.width), float(page.height)) for page in pdf.pages}
+
+    @staticmethod
+    def page_count(pdf_path: Source) -> int:
+        """Number of pages that will be processed (capped at ``settings.MAX_PAGES``)"""
+        return min(settings.MAX_PAGES, PageRenderer.document_pages(pdf_path))
+
+    @staticmethod
+    def document_pages(pdf_path: Source) -> int:
+        """Total number of pages in the document, read from the page tree root when it is reliable"""
+        with pdfplumber.open(DocumentSource.open(pdf_path)) as pdf:
+            try:
+                count = pdftypes.resolve1(pdftypes.resolve1(pdf.doc.catalog['Pages'])['Count'])
+                if isinstance(count, int) and count > 0:
+                    return count
+            except Exception:
+                pass
+            return len(pdf.pages)
+
+    @staticmethod
+    def estimate_pixels(size: Tuple[float, float], dpi: int) -> int:
+        width, height = size
+        return int(width / 72 * dpi) * int(height / 72 * dpi)
+
+    @staticmethod
+    def estimate_text_height(image: Image.Image, dpi: int) -> Optional[float]:
+        """Median height of the text lines of a low-resolution render, in points.
+
+        Lines are runs of rows whose ink clearly exceeds that of the gaps between lines; runs
+        taller than a tenth of the page (figures, photos) are ignored. Returns None when the page
+        has too few lines to tell.
+        """
+        gray = np.asarray(image.convert('L'))
+        ink = (gray < 128).sum(axis=1)
+        if not ink.any():
+            return None
+        inked = ink > 0.2 * np.median(ink[ink > 0])
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], inked.astype(np.int8), [0]))))
+        heights = edges[1::2] - edges[::2]
+        heights = heights[(heights >= 2) & (heights <= gray.shape[0] / 10)]
+        if len(heights) < 3:
+            return None
+        return float(np.median(heights)) * 72 / dpi
+
+    @staticmethod
+    def choose_dpi(size: Tuple[float, float], text_height: Optional[float] = None, dpi: Optional[int] = None) -> int:
+        """DPI for a page of ``size`` points: ``dpi`` if given, else one that brings ``text_height``
+        (points) to ``settings.RENDER_TEXT_HEIGHT_PX`` pixels, else ``settings.RENDER_DPI``.
+        Always capped so the page stays within ``settings.RENDER_MAX_PAGE_PIXELS``."""
+        if dpi is None:
+            dpi = settings.RENDER_DPI
+            if text_height:
+                dpi = settings.RENDER_TEXT_HEIGHT_PX * 72 / text_height
+                dpi = min(max(dpi, settings.RENDER_MIN_DPI), settings.RENDER_MAX_DPI)
+                # Rounded so that neighbouring pages usually share one pdftoppm call
+                dpi = round(dpi / settings.RENDER_DPI_STEP) * settings.RENDER_DPI_STEP
+        width, height = size
+        cap = 72 * math.sqrt(settings.RENDER_MAX_PAGE_PIXELS / max(width * height, 1.0))
+        return int(min(dpi, cap))
+
+    @classmethod
+    def probe_dpis(cls, path: str, first: int, last: int, sizes: Dict[int, Tuple[float, float]]) -> Dict[int, int]:
+        """Adaptive DPI for each of the consecutive pages ``first..last``, from one low-resolution render"""
+        probe_dpi = settings.RENDER_PROBE_DPI
+        images = pdf2image.convert_from_path(path, dpi=probe_dpi, first_page=first, last_page=last, grayscale=True)
+        return {
+            number: cls.choose_dpi(sizes[number], cls.estimate_text_height(image, probe_dpi))
+            for number, image in zip(range(first, last + 1), images)
+        }
+
+    @classmethod
+    def iter_pages(cls, pdf_path: Source, last_page: Optional[int] = None, dpi: Optional[int] = None,
+                   grayscale: bool = True, pages: Optional[Sequence[int]] = None) -> Iterator[RenderedPage]:
+        """Yield pages 1..last_page, or only the 1-based page numbers in ``pages`` (in the given order).
+
+        Pages that are not requested are never parsed or rasterized. A fixed ``dpi`` skips the
+        adaptive DPI probe (the pixel cap still applies).
+        """
+        if pages is None and last_page is not None:
+            pages = range(1, last_page + 1)
+        sizes = cls.page_sizes(pdf_path, pages)
+        numbers = [number for number in pages if number in sizes] if pages is not None else sorted(sizes)
+
+        if not numbers:
+            return
+        # poppler reads from a file: in-memory uploads are written out once for all windows
+        with DocumentSource.as_path(pdf_path) as path:
+            for chunk in cls._chunks(numbers):
+                start = time.perf_counter()
+                if dpi is None and settings.RENDER_ADAPTIVE_DPI:
+                    dpis = cls.probe_dpis(path, chunk[0], chunk[-1], sizes)
+                else:
+                    dpis = {number: cls.choose_dpi(sizes[number], dpi=dpi or settings.RENDER_DPI) for number in chunk}
+                probe_time = (time.perf_counter() - start) / len(chunk)
+
+                for first, last in cls._windows(chunk, sizes, dpis):
+                    start = time.perf_counter()
+                    images = pdf2image.convert_from_path(path, dpi=dpis[first], first_page=first, last_page=last,
+                                                        grayscale=grayscale)
+                    render_time = (time.perf_counter() - start) / max(len(images), 1) + probe_time
+
+                    for offset, image in enumerate(images):
+                        yield RenderedPage(page=first + offset, image=image, render_time=render_time, dpi=dpis[first])
+                    del images
+
+    @staticmethod
+    def _chunks(numbers: Sequence[int]) -> Iterator[List[int]]:
+        """Runs of consecutive page numbers, at most ``settings.RENDER_WINDOW_PAGES`` long"""
+        chunk: List[int] = []
+        for number in numbers:
+            if chunk and (number != chunk[-1] + 1 or len(chunk) >= settings.RENDER_WINDOW_PAGES):
+                yield chunk
+                chunk = []
+            chunk.append(number)
+        if chunk:
+            yield chunk
+
+    @classmethod
+    def _windows(cls, chunk: List[int], sizes: Dict[int, Tuple[float, float]],
+                 dpis: Dict[int, int]) -> List[Tuple[int, int]]:
+        """Split a chunk into pdftoppm calls: pages at the same DPI within ``settings.RENDER_PIXEL_BUDGET``"""
+        windows: List[List[int]] = []  # [first, last, pixels]
+        for number in chunk:
+            pixels = cls.estimate_pixels(sizes[number], dpis[number])
+            if windows and dpis[number] == dpis[windows[-1][0]] and windows[-1][2] + pixels <= settings.RENDER_PIXEL_BUDGET:
+                windows[-1][1] = number
+                windows[-1][2] += pixels
+            else:
+                windows.append([number, number, pixels])
+        return [(first, last) for first, last, _ in windows]
@@ -1,63 +1,639 @@
-from flask import Blueprint, request, jsonify
-import os
-import tempfile
+from flask import Blueprint, Response, current_app, request, jsonify
+import base64
+import binascii
+from contextlib import ExitStack, nullcontext
+import itertools
+import json
+import queue
+import time
+import zipfile
+from .admission import AdmissionControl, Saturated
+from .cache import ResultCache
+from .columnar import ColumnarEncoder
+from .engine import Deadline
 from .extraction import PDFExtractor
+from .jobs import JobManager
+from .metrics import RequestMetrics, metrics
+from .preprocessing import Preprocessor
+from .regions import Template, TemplateRegistry
+from .rendering import PageRenderer, PageSelection
+from .uploads import DocumentSource
+from .utils import ExtractionUtils
 from config import settings
 
 api_routes = Blueprint('api', __name__)
 
-def save_upload(file, suffix):
-    temp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
-    file.save(temp.name)
-    return temp.name
+result_cache = ResultCache(
+    'results', max_items=settings.RESULT_CACHE_ITEMS, max_memory_bytes=settings.RESULT_CACHE_MEMORY_BYTES,
+    disk_dir=settings.CACHE_DIR, max_disk_bytes=settings.RESULT_CACHE_MAX_BYTES
+)
 
-@api_routes.route("/extract/standard", methods=['POST'])
-def extract_standard():
-    if 'file' not in request.files: return jsonify({"error": "No file"}), 400
-    file = request.files['file']
-    
-    temp_path = save_upload(file, '.pdf')
+job_manager = JobManager(
+    settings.JOB_DIR, workers=settings.JOB_WORKERS, max_queue=settings.JOB_QUEUE_SIZE, ttl=settings.JOB_TTL
+)
+metrics.gauge("dataxtractor_job_queue_depth", job_manager.queue_depth)
+
+template_registry = TemplateRegistry(settings.TEMPLATE_DIR)
+
+# OCR requests admitted at once across every web worker on the host
+admission = AdmissionControl(settings.ADMISSION_DIR, AdmissionControl.default_slots())
+metrics.gauge("dataxtractor_admission_slots_in_use", lambda: admission.held)
+
+MODES = ('standard', 'ocr', 'hybrid', 'columns', 'template', 'xls')
+PAGED_MODES = ('ocr', 'hybrid', 'columns', 'template')
+BATCH_MODES = ('standard', 'ocr', 'hybrid', 'columns', 'template')
+
+def ocr_slot(mode, wait=None):
+    """An admission slot for OCR modes, waiting up to ``wait`` seconds (forever if None); other modes need none"""
+    return admission.slot(wait) if mode in PAGED_MODES else nullcontext()
+
+def busy_response(error):
+    metrics.inc("dataxtractor_admission_rejected_total")
+    response = jsonify({"error": str(error)})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 429
+
+def remove_files(sources):
+    for source in sources:
+        DocumentSource.discard(source)
+
+def unpack_zip(archive_file, prefix, limit, max_bytes):
+    """Spool the PDFs in a ZIP archive: [(prefix/member name, source)]"""
+    documents, unpacked_bytes = [], 0
+    try:
+        with zipfile.ZipFile(archive_file) as archive:
+            for member in archive.infolist():
+                name = member.filename
+                if member.is_dir() or not name.lower().endswith('.pdf') or name.startswith('__MACOSX/'):
+                    continue
+                unpacked_bytes += member.file_size
+                if unpacked_bytes > max_bytes:
+                    raise ValueError("ZIP contents exceed the batch size limit")
+                if len(documents) >= limit:
+                    raise ValueError(f"A batch holds at most {settings.BATCH_MAX_FILES} files")
+                with archive.open(member) as stream:
+                    documents.append((f"{prefix}/{name}", DocumentSource.spool(stream, member.file_size, '.pdf')))
+    except zipfile.BadZipFile:
+        raise ValueError(f"Invalid ZIP archive: {prefix}")
+    except Exception:
+        remove_files(source for _, source in documents)
+        raise
+    return documents
+
+def receive_batch(files):
+    """Spool every uploaded PDF, unpacking ZIP archives, and return [(filename, source)]"""
+    documents = []
+    try:
+        for file in files:
+            if len(documents) >= settings.BATCH_MAX_FILES:
+                raise ValueError(f"A batch holds at most {settings.BATCH_MAX_FILES} files")
+            if file.filename.lower().endswith('.zip'):
+                documents += unpack_zip(file.stream, file.filename, settings.BATCH_MAX_FILES - len(documents),
+                                        settings.BATCH_MAX_BYTES)
+            else:
+                documents.append((file.filename, DocumentSource.receive(file, '.pdf')))
+    except Exception:
+        remove_files(source for _, source in documents)
+        raise
+    return documents
+
+def page_limit_error(source):
+    """Error message when a PDF has more than ``settings.MAX_UPLOAD_PAGES`` pages, else None.
+
+    Unreadable PDFs pass here and are reported by the extraction itself.
+    """
+    try:
+        pages = PageRenderer.document_pages(source)
+    except Exception:
+        return None
+    if pages > settings.MAX_UPLOAD_PAGES:
+        return f"Document has {pages} pages; the limit is {settings.MAX_UPLOAD_PAGES}"
+    return None
+
+def parse_partitions(form):
+    """Column boundaries as page-width fractions: ``partitions=0.33,0.66`` or legacy left/right_partition.
+
+    Returns None (detect gutters per page) when nothing is given or ``partitions=auto``.
+    """
+    given = [form.get(name) for name in ('partitions', 'left_partition', 'right_partition')]
+    if form.get('partitions') == 'auto' or not any(given):
+        return None
+    if form.get('partitions'):
+        partitions = [float(value) for value in form['partitions'].split(',') if value.strip()]
+    else:
+        partitions = [float(form.get('left_partition', 0.4)), float(form.get('right_partition', 0.6))]
+    if not all(0 < value < 1 for value in partitions):
+        raise ValueError("Partitions must be fractions between 0 and 1")
+    return sorted(set(partitions))
+
+def parse_column_language(form):
+    """Columns are OCR'd in one pass, so per-column languages (lang_first/lang_second) are combined"""
+    if form.get('language'):
+        return form['language']
+    languages = [form[name] for name in ('lang_first', 'lang_second') if form.get(name)]
+    return "+".join(dict.fromkeys(languages)) or 'eng'
+
+def parse_ocr_params(form):
+    """Language and optional preprocessing pipeline (``preprocess=auto|legacy|clean|...|stage,stage``)"""
+    pipeline = form.get('preprocess') or None
+    if pipeline and pipeline != 'auto':
+        Preprocessor.resolve(pipeline)
+    return {'language': form.get('language', 'eng'), 'pipeline': pipeline}
+
+def parse_page_selection(form):
+    """PDF page selection: ``pages`` (1-based, e.g. ``1,3,5-7``), ``first_page``/``last_page`` and
+    ``sample`` (that many pages spread evenly over the selection), or the pages left over in a
+    ``continuation`` token. Returns None when nothing is given."""
+    if form.get('continuation'):
+        return PageSelection(pages=tuple(parse_continuation(form['continuation'])['pages']))
+    if not any(form.get(name) for name in ('pages', 'first_page', 'last_page', 'sample')):
+        return None
+    pages = None
+    if form.get('pages'):
+        # Ranges are checked before they are expanded: no accepted PDF has more than MAX_UPLOAD_PAGES pages
+        pages = set()
+        for part in split_list(form['pages']):
+            first, _, last = part.partition('-')
+            first, last = int(first), int(last or first)
+            if first < 1:
+                raise ValueError("pages, first_page, last_page and sample must be positive")
+            if last < first:
+                raise ValueError(f"Invalid page range: {part}")
+            if last > settings.MAX_UPLOAD_PAGES:
+                raise ValueError(f"Page {last} is out of range; documents have at most {settings.MAX_UPLOAD_PAGES} pages")
+            pages.update(range(first, last + 1))
+    bounds = {name: int(form[name]) if form.get(name) else None for name in ('first_page', 'last_page', 'sample')}
+    if any(value is not None and value < 1 for value in bounds.values()):
+        raise ValueError("pages, first_page, last_page and sample must be positive")
+    if bounds['first_page'] and bounds['last_page'] and bounds['first_page'] > bounds['last_page']:
+        raise ValueError("first_page must not be after last_page")
+    return PageSelection(pages=tuple(sorted(pages)) if pages is not None else None, **bounds)
+
+def parse_continuation(token):
+    """Decode a continuation token: ``{"digest": <document sha256>, "pages": [remaining pages]}``"""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token.encode()))
+        pages = [int(page) for page in state['pages']]
+        digest = str(state['digest'])
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise ValueError("Invalid continuation token")
+    if not pages or min(pages) < 1:
+        raise ValueError("Invalid continuation token")
+    return {'digest': digest, 'pages': pages}
+
+def continuation_error(source, form):
+    """Why the ``continuation`` token can't resume ``source``, or None"""
+    if not form.get('continuation'):
+        return None
+    try:
+        state = parse_continuation(form['continuation'])
+    except ValueError as e:
+        return str(e)
+    if state['digest'] != ResultCache.file_digest(source):
+        return "The continuation token belongs to a different document"
+    return None
+
+def page_selection_error(source, form):
+    """Why the page selection can't apply to ``source`` (it names pages the PDF does not have), or None"""
+    try:
+        selection = parse_page_selection(form)
+    except ValueError as e:
+        return str(e)
+    if selection is None:
+        return None
     try:
-        text = PDFExtractor.extract_text_standard(temp_path)
-        return jsonify({"filename": file.filename, "text": text})
+        total = PageRenderer.document_pages(source)
+    except Exception:
+        return None  # unreadable PDFs are reported by the extraction itself
+    requested = max(selection.pages or [selection.first_page or 1])
+    if requested > total:
+        return f"Page {requested} is out of range; the document has {total} pages"
+    if not selection.resolve(total):
+        return "No pages selected"
+    return None
+
+def parse_deadline(form):
+    """Time budget from ``time_budget`` (seconds) and/or ``deadline`` (Unix time), whichever is
+    sooner, else ``settings.REQUEST_TIME_BUDGET``. The seconds count from when extraction starts,
+    after any wait for an admission slot."""
+    seconds = float(form['time_budget']) if form.get('time_budget') else None
+    until = float(form['deadline']) if form.get('deadline') else None
+    if seconds is None and until is None:
+        seconds = settings.REQUEST_TIME_BUDGET or None
+    if seconds is None and until is None:
+        return None
+    if (seconds is not None and seconds <= 0) or (until is not None and until <= time.time()):
+        raise ValueError("time_budget must be positive and deadline in the future")
+    return Deadline(seconds, until)
+
+def parse_template(form):
+    """The registered form template named by ``template``"""
+    name = form.get('template')
+    if not name:
+        raise ValueError("template is required")
+    template = template_registry.get(name)
+    if template is None:
+        raise ValueError(f"Unknown template: {name}")
+    return template
+
+def split_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()] if value else None
+
+def parse_excel_params(form):
+    """Excel selection: ``sheets`` (names or 1-based numbers), ``rows`` (1-based data rows, e.g. ``10-500``
+    or ``10-``), ``columns`` (header names) and optional pagination (``page_size``, ``page``)"""
+    start, stop = 0, None
+    if form.get('rows'):
+        first, _, last = form['rows'].partition('-')
+        start = int(first) - 1 if first.strip() else 0
+        stop = int(last) if last.strip() else (None if '-' in form['rows'] else start + 1)
+        if start < 0 or (stop is not None and stop <= start):
+            raise ValueError("rows must be a 1-based range such as 1-100")
+    page_size = int(form['page_size']) if form.get('page_size') else None
+    page = int(form.get('page', 1))
+    if page < 1 or (page_size is not None and page_size < 1):
+        raise ValueError("page and page_size must be positive")
+    return {'sheets': split_list(form.get('sheets')), 'columns': split_list(form.get('columns')),
+            'start': start, 'stop': stop, 'page': page, 'page_size': page_size}
+
+def excel_selection(params, extra_rows=0):
+    """SheetReader arguments for the requested page of the row range"""
+    start, stop = params['start'], params['stop']
+    if params['page_size']:
+        start += (params['page'] - 1) * params['page_size']
+        page_stop = start + params['page_size'] + extra_rows
+        stop = page_stop if stop is None else min(stop, page_stop)
+    return {'sheets': params['sheets'], 'columns': params['columns'], 'start': start, 'stop': stop}
+
+def excel_result(source, params):
+    if not params['page_size']:
+        return {"data": PDFExtractor.extract_excel(source, **excel_selection(params))}
+    # Read one row past the page to tell whether another page follows
+    page_size = params['page_size']
+    data = PDFExtractor.extract_excel(source, **excel_selection(params, extra_rows=1))
+    more = any(len(records) > page_size for records in data.values())
+    return {
+        "data": {name: records[:page_size] for name, records in data.items()},
+        "page": params['page'], "page_size": page_size, "next_page": params['page'] + 1 if more else None,
+    }
+
+def columns_result(page_results):
+    """Join per-page column text into document columns, keeping each page's partitions"""
+    layouts = [{"page": result.page, "partitions": result.partitions} for result in page_results]
+    columns = PDFExtractor.join_columns(page_results)
+    payload = {"columns": columns, "layouts": layouts}
+    for index, column in enumerate(columns, start=1):
+        payload[f"column_{index}"] = column
+    return payload
+
+def template_result(page_results):
+    """Region text per page, plus ``fields`` holding the first non-empty value of each region"""
+    pages = [{"page": result.page, "fields": result.fields} for result in page_results]
+    fields = {}
+    for page in pages:
+        for name, value in page["fields"].items():
+            if not fields.get(name):
+                fields[name] = value
+    return {"fields": fields, "pages": pages}
+
+def planned_pages(mode, source, params):
+    """Page numbers a paged mode will process for ``params``"""
+    if mode == 'template':
+        pages = PDFExtractor.template_pages(source, params['template'], params['page_selection'])
+        if pages is not None:
+            return pages
+    return (params['page_selection'] or PageSelection()).resolve(PageRenderer.document_pages(source))
+
+def continuation(mode, source, params, deadline, done_pages):
+    """``continuation`` token and ``remaining_pages`` when ``deadline`` cut an extraction short"""
+    if deadline is None or not deadline.reached:
+        return {}
+    remaining = sorted(set(planned_pages(mode, source, params)) - set(done_pages))
+    if not remaining:
+        return {}
+    state = {"digest": ResultCache.file_digest(source), "pages": remaining}
+    token = base64.urlsafe_b64encode(json.dumps(state, separators=(',', ':')).encode()).decode()
+    return {"continuation": token, "remaining_pages": remaining}
+
+def observed(page_results, on_page=None):
+    """Pass page results through, reporting each one to ``on_page`` as it completes"""
+    for result in page_results:
+        if on_page:
+            on_page(result)
+        yield result
+
+def track(page_results, on_page=None):
+    return list(observed(page_results, on_page))
+
+def mode_params(mode, form):
+    """Validated parameters for ``mode``; they are part of the result cache key"""
+    if mode == 'standard':
+        return {'page_selection': parse_page_selection(form)}
+    if mode in ('ocr', 'hybrid'):
+        return {**parse_ocr_params(form), 'page_selection': parse_page_selection(form)}
+    if mode == 'columns':
+        return {'partitions': parse_partitions(form), 'language': parse_column_language(form),
+                'page_selection': parse_page_selection(form)}
+    if mode == 'template':
+        return {'template': parse_template(form), 'page_selection': parse_page_selection(form)}
+    if mode == 'xls':
+        return parse_excel_params(form)
+    raise ValueError(f"Unknown mode: {mode}")
+
+def pages_payload(mode, page_results):
+    """Response payload (without filename) for one document's page results"""
+    if mode == 'hybrid':
+        pages = [{"page": result.page, "method": result.method, "text": result.text} for result in page_results]
+        return {"text": "".join(page["text"] + "\n" for page in pages), "pages": pages}
+    if mode == 'columns':
+        return columns_result(page_results)
+    if mode == 'template':
+        return template_result(page_results)
+    return {"text": "".join(result.text + "\n" for result in page_results)}
+
+def result_key(source, mode, params):
+    return ResultCache.make_key(settings.VERSION, ResultCache.file_digest(source), mode, params)
+
+def cached_result(key, mode):
+    result = result_cache.get(key)
+    metrics.inc("dataxtractor_result_cache_total", mode=mode, outcome='miss' if result is None else 'hit')
+    return result
+
+def cached_extraction(source, mode, params, extract):
+    """Return a cached result for identical upload bytes + mode + params, computing it on a miss.
+
+    Partial results (cut short by a deadline) are not cached.
+    """
+    key = result_key(source, mode, params)
+    result = cached_result(key, mode)
+    if result is None:
+        result = extract()
+        if "continuation" not in result:
+            result_cache.set(key, result)
+    return result
+
+def iter_mode_pages(mode, source, params, deadline=None):
+    """Page results of a PDF mode; paged (OCR) modes stop scheduling pages at ``deadline``"""
+    if mode == 'standard':
+        return PDFExtractor.iter_pages_standard(source, **params)
+    iter_pages = {
+        'ocr': PDFExtractor.iter_pages_ocr,
+        'hybrid': PDFExtractor.iter_pages_hybrid,
+        'columns': PDFExtractor.iter_pages_columns,
+        'template': PDFExtractor.iter_pages_template,
+    }[mode]
+    return iter_pages(source, deadline=deadline, **params)
+
+def extract_payload(mode, source, form, on_page=None, deadline=None, slot_wait=None):
+    """Run one extraction mode on a saved upload and return the response payload (without filename).
+
+    OCR modes take an admission slot on a cache miss, waiting up to ``slot_wait`` seconds
+    (forever if None) before raising ``Saturated``.
+    """
+    params = mode_params(mode, form)
+    if mode == 'standard':
+        extract = lambda: {"text": PDFExtractor.extract_text_standard(source, **params)}
+    elif mode == 'xls':
+        extract = lambda: excel_result(source, params)
+    else:
+        def extract():
+            with ocr_slot(mode, slot_wait):
+                page_results = track(iter_mode_pages(mode, source, params, deadline), on_page)
+            payload = pages_payload(mode, page_results)
+            payload.update(continuation(mode, source, params, deadline, [result.page for result in page_results]))
+            return payload
+    return cached_extraction(source, mode, params, extract)
+
+def wants_stream():
+    """NDJSON streaming is requested with ``stream=1`` or ``Accept: application/x-ndjson``"""
+    if request.values.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson'
+
+def page_record(result):
+    record = {"page": result.page, "method": result.method, "text": result.text}
+    if result.columns is not None:
+        record.update(columns=result.columns, partitions=result.partitions)
+    if result.fields is not None:
+        record.update(fields=result.fields)
+    return record
+
+def iter_records(mode, source, form, on_page=None, deadline=None, summary=None):
+    """Per-page (per row batch for Excel) records for a streaming response.
+
+    Parameters are validated here, before the first record is produced. If ``deadline`` cuts
+    a paged mode short, the continuation is added to ``summary`` once the pages are done.
+    """
+    if mode == 'xls':
+        chunks = PDFExtractor.iter_excel_chunks(source, **excel_selection(parse_excel_params(form)))
+        # Unknown sheets and columns only show up once the workbook is read
+        first = next(chunks, None)
+        chunks = itertools.chain([first] if first else [], chunks)
+        return (
+            {"sheet": name, "rows": [row, row + len(records) - 1], "records": records}
+            for name, row, records in chunks
+        )
+    params = mode_params(mode, form)
+    results = iter_mode_pages(mode, source, params, deadline)
+
+    def records():
+        done_pages = []
+        for result in observed(results, on_page):
+            done_pages.append(result.page)
+            yield page_record(result)
+        if summary is not None:
+            summary.update(continuation(mode, source, params, deadline, done_pages))
+    return records()
+
+def wants_columnar():
+    """Columnar output format requested with ``format=arrow|parquet`` or by Accept header, else None"""
+    fmt = request.values.get('format', '').lower()
+    if fmt in ('', 'json'):
+        best = request.accept_mimetypes.best_match(['application/json', *ColumnarEncoder.MIMETYPES.values()])
+        return next((name for name, mimetype in ColumnarEncoder.MIMETYPES.items() if mimetype == best), None)
+    if fmt not in ColumnarEncoder.MIMETYPES:
+        raise ValueError(f"Unknown format: {fmt}. Must be json, {' or '.join(ColumnarEncoder.MIMETYPES)}")
+    return fmt
+
+def columnar_payload(source, fmt, request_metrics):
+    """One sheet as an Arrow IPC stream or Parquet file instead of per-row JSON records"""
+    params = parse_excel_params(request.form)
+    if params['sheets'] and len(params['sheets']) > 1:
+        raise ValueError("Columnar output holds a single sheet; select one with sheets=")
+    with request_metrics.stage('extract'):
+        sheet, body = PDFExtractor.extract_excel_table(source, fmt, **excel_selection(params))
+    response = Response(body, mimetype=ColumnarEncoder.MIMETYPES[fmt])
+    response.headers['X-Sheet-Name'] = sheet
+    return response
+
+def wants_timings():
+    return request.values.get('timings', '').lower() in ('1', 'true', 'yes')
+
+def json_response(body, request_metrics):
+    """``body`` as a JSON response, encoded in the ``serialize`` stage. The timings (``timings=1``)
+    are appended to the encoded body afterwards, so they include serialization."""
+    with request_metrics.stage('serialize'):
+        data = current_app.json.dumps(body)
+    if wants_timings():
+        data = f'{data[:-1]}, "timings": {current_app.json.dumps(request_metrics.report())}}}'
+    return current_app.response_class(f"{data}\n", mimetype=current_app.json.mimetype)
+
+def ndjson_response(records, summary, request_metrics, sources, on_close=None):
+    """Stream ``records`` as NDJSON, then ``summary``. Takes ownership of ``sources``;
+    ``on_close`` runs once the stream ends (e.g. to release an admission slot)."""
+    include_timings = wants_timings()
+
+    def generate():
+        count, status = 0, 'ok'
+        try:
+            for record in records:
+                count += 1
+                yield json.dumps(record, default=str) + "\n"
+            summary.update(done=True, records=count)
+            if include_timings:
+                summary["timings"] = request_metrics.report()
+            yield json.dumps(summary) + "\n"
+        except Exception as e:
+            status = 'error'
+            yield json.dumps({"error": str(e)}) + "\n"
+        finally:
+            remove_files(sources)
+            if on_close:
+                on_close()
+            request_metrics.finish(status)
+
+    response = Response(generate(), mimetype='application/x-ndjson')
+    response.headers['X-Accel-Buffering'] = 'no'  # don't let a reverse proxy buffer the stream
+    return response
+
+def stream_payload(mode, source, filename, request_metrics, deadline=None):
+    """Stream one JSON record per page as soon as it is ready. Takes ownership of ``source``."""
+    summary = {"filename": filename}
+    slot = ExitStack()
+    try:
+        records = iter_records(mode, source, request.form.to_dict(), on_page=request_metrics.page,
+                               deadline=deadline, summary=summary)
+        slot.enter_context(ocr_slot(mode, settings.ADMISSION_WAIT))
+    except (ValueError, Saturated) as e:
+        remove_files([source])
+        request_metrics.finish('invalid' if isinstance(e, ValueError) else 'busy')
+        return busy_response(e) if isinstance(e, Saturated) else (jsonify({"error": str(e)}), 400)
+    return ndjson_response(records, summary, request_metrics, [source], on_close=slot.close)
+
+def iter_batch_records(mode, documents, form, on_page=None):
+    """One record per document of a batch, carrying its ``index`` in upload order.
+
+    Unreadable and cached documents are answered first; the rest are extracted together through
+    ``PDFExtractor.iter_batch`` so their pages share one work queue, and come back as each finishes.
+    A document that fails to extract gets an ``error`` record; the rest of the batch carries on.
+    """
+    params = mode_params(mode, form)
+    pending = []
+    for index, (filename, source) in enumerate(documents):
+        error = page_limit_error(source) or (None if ExtractionUtils.validate_pdf(source) else "Invalid or unreadable PDF")
+        if error:
+            yield {"index": index, "filename": filename, "error": error}
+            continue
+        key = result_key(source, mode, params)
+        result = cached_result(key, mode)
+        if result is not None:
+            yield {"index": index, "filename": filename, **result}
+        else:
+            pending.append((index, filename, key))
+
+    results = PDFExtractor.iter_batch(mode, [documents[index][1] for index, _, _ in pending], **params)
+    unanswered = set(range(len(pending)))
+    for position, group in itertools.groupby(results, key=lambda item: item[0]):
+        index, filename, key = pending[position]
+        unanswered.discard(position)
+        page_results = [result for _, result in group]
+        failure = next((result for result in page_results if isinstance(result, Exception)), None)
+        if failure is not None:
+            yield {"index": index, "filename": filename, "error": str(failure) or type(failure).__name__}
+            continue
+        page_results = track(page_results, on_page)
+        yield {"index": index, "filename": filename, **result_cache.set(key, pages_payload(mode, page_results))}
+    # Documents with no page to extract (e.g. none of the selected or template pages exist) yield no results
+    for position in sorted(unanswered):
+        index, filename, key = pending[position]
+        yield {"index": index, "filename": filename, **result_cache.set(key, pages_payload(mode, []))}
+
+def run_extraction(mode, file, suffix):
+    """Save the upload, run ``mode`` on it and build the response, timing each stage"""
+    request_metrics = RequestMetrics(mode)
+    try:
+        deadline = parse_deadline(request.form) if mode in PAGED_MODES else None
+    except ValueError as e:
+        request_metrics.finish('invalid')
+        return jsonify({"error": str(e)}), 400
+    with request_metrics.stage('upload'):
+        source = DocumentSource.receive(file, suffix)
+        error = page_limit_error(source) if suffix == '.pdf' else None
+    if error:
+        remove_files([source])
+        request_metrics.finish('invalid')
+        return jsonify({"error": error}), 413
+    error = continuation_error(source, request.form)
+    if not error and suffix == '.pdf':
+        error = page_selection_error(source, request.form)
+    if error:
+        remove_files([source])
+        request_metrics.finish('invalid')
+        return jsonify({"error": error}), 400
+    if wants_stream() and not request.values.get('format'):
+        return stream_payload(mode, source, file.filename, request_metrics, deadline)
+    status = 'ok'
+    try:
+        fmt = wants_columnar()
+        if fmt:
+            if mode != 'xls':
+                raise ValueError("Columnar output is only available for Excel extraction")
+            if not ColumnarEncoder.available():
+                status = 'invalid'
+                return jsonify({"error": "Columnar output requires pyarrow, which is not installed"}), 406
+            return columnar_payload(source, fmt, request_metrics)
+        with request_metrics.stage('extract'):
+            payload = extract_payload(mode, source, request.form, on_page=request_metrics.page, deadline=deadline,
+                                      slot_wait=settings.ADMISSION_WAIT)
+        return json_response({"filename": file.filename, **payload}, request_metrics)
+    except Saturated as e:
+        status = 'busy'
+        return busy_response(e)
+    except ValueError as e:
+        status = 'invalid'
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
+        status = 'error'
         return jsonify({"error": str(e)}), 500
     finally:
-        if os.path.exists(temp_path): os.unlink(temp_path)
+        remove_files([source])
+        request_metrics.finish(status)
+
+@api_routes.route("/extract/standard", methods=['POST'])
+def extract_standard():
+    if 'file' not in request.files: return jsonify({"error": "No file"}), 400
+    return run_extraction('standard', request.files['file'], '.pdf')
 
 @api_routes.route("/extract/ocr", methods=['POST'])
 def extract_ocr():
     if 'file' not in request.files: return jsonify({"error": "No file"}), 400
-    file = request.files['file']
-    
-    temp_path = save_upload(file, '.pdf')
-    try:
-        # Default to English, but allow param override
-        lang = request.form.get('language', 'eng')
-        text = PDFExtractor.extract_text_ocr(temp_path, language=lang)
-        return jsonify({"filename": file.filename, "text": text})
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    finally:
-        if os.path.exists(temp_path): os.unlink(temp_path)
+    # Default to English, but allow param override (form field 'language')
+    return run_extraction('ocr', request.files['file'], '.pdf')
+
+@api_routes.route("/extract/hybrid", methods=['POST'])
+def extract_hybrid():
+    if 'file' not in request.files: return jsonify({"error": "No file"}), 400
+    return run_extraction('hybrid', request.files['file'], '.pdf')
 
 @api_routes.route("/extract/columns", methods=['POST'])
 def extract_columns():
     if 'file' not in request.files: return jsonify({"error": "No file"}), 400
-    file = request.files['file']
-    
-    temp_path = save_upload(file, '.pdf')
-    try:
-        col1, col2 = PDFExtractor.extract_columns(temp_path)
-        return jsonify({
-            "filename": file.filename, 
-            "column_1": col1, 
-            "column_2": col2
-        })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    finally:
-        if os.path.exists(temp_path): os.unlink(temp_path)
+    return run_extraction('columns', request.files['file'], '.pdf')
+
+@api_routes.route("/extract/template", methods=['POST'])
+def extract_template():
+    if 'file' not in request.files: return jsonify({"error": "No file"}), 400
+    return run_extraction('template', request.files['file'], '.pdf')
 
 @api_routes.route("/extract/xls", methods=['POST'])
 def extract_excel():
@@ -68,11 +644,150 @@ def extract_excel():
     if not (file.filename.endswith('.xlsx') or file.filename.endswith('.xls')):
         return jsonify({"error": "Invalid file type. Must be Excel."}), 400
 
-    temp_path = save_upload(file, '.xlsx')
+    return run_extraction('xls', file, '.xlsx')
+
+@api_routes.route("/extract/batch", methods=['POST'])
+def extract_batch():
+    files = request.files.getlist('files') + request.files.getlist('file')
+    if not files: return jsonify({"error": "No file"}), 400
+
+    mode = request.form.get('mode', 'ocr')
+    if mode not in BATCH_MODES:
+        return jsonify({"error": f"Invalid mode. Must be one of: {', '.join(BATCH_MODES)}"}), 400
+    request_metrics = RequestMetrics(f"batch:{mode}")
+    try:
+        mode_params(mode, request.form)
+        with request_metrics.stage('upload'):
+            documents = receive_batch(files)
+    except ValueError as e:
+        request_metrics.finish('invalid')
+        return jsonify({"error": str(e)}), 400
+    sources = [source for _, source in documents]
+    slot = ExitStack()
+    try:
+        slot.enter_context(ocr_slot(mode, settings.ADMISSION_WAIT))
+    except Saturated as e:
+        remove_files(sources)
+        request_metrics.finish('busy')
+        return busy_response(e)
+
+    records = iter_batch_records(mode, documents, request.form.to_dict(), on_page=request_metrics.page)
+    if wants_stream():
+        return ndjson_response(records, {"files": len(documents)}, request_metrics, sources, on_close=slot.close)
+    status = 'ok'
     try:
-        data = PDFExtractor.extract_excel(temp_path)
-        return jsonify({"filename": file.filename, "data": data})
+        with request_metrics.stage('extract'), slot:
+            body = {"files": sorted(records, key=lambda record: record["index"])}
+        return json_response(body, request_metrics)
     except Exception as e:
+        status = 'error'
         return jsonify({"error": str(e)}), 500
     finally:
-        if os.path.exists(temp_path): os.unlink(temp_path)
+        remove_files(sources)
+        request_metrics.finish(status)
+
+@api_routes.route("/jobs", methods=['POST'])
+def submit_job():
+    if 'file' not in request.files: return jsonify({"error": "No file"}), 400
+    file = request.files['file']
+
+    mode = request.form.get('mode', 'ocr')
+    if mode not in MODES:
+        return jsonify({"error": f"Invalid mode. Must be one of: {', '.join(MODES)}"}), 400
+    try:
+        priority = int(request.form.get('priority', 5))
+        mode_params(mode, request.form)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # The job outlives the request, so it owns the upload and a snapshot of the form
+    source = DocumentSource.receive(file, '.xlsx' if mode == 'xls' else '.pdf')
+    error = page_limit_error(source) if mode != 'xls' else None
+    if error:
+        remove_files([source])
+        return jsonify({"error": error}), 413
+    error = continuation_error(source, request.form)
+    if not error and mode != 'xls':
+        error = page_selection_error(source, request.form)
+    if error:
+        remove_files([source])
+        return jsonify({"error": error}), 400
+    form = request.form.to_dict()
+
+    def run(progress):
+        job_metrics = RequestMetrics(f"job:{mode}")
+        total = None
+        if mode in PAGED_MODES:
+            total = len(planned_pages(mode, source, mode_params(mode, form)))
+
+        def on_page(result):
+            job_metrics.page(result)
+            progress(result.page, total)
+
+        status = 'error'
+        try:
+            with job_metrics.stage('extract'):
+                payload = extract_payload(mode, source, form, on_page=on_page)
+            status = 'ok'
+            return payload
+        finally:
+            job_metrics.finish(status)
+
+    def cleanup():
+        remove_files([source])
+
+    try:
+        record = job_manager.submit(run, mode, filename=file.filename, priority=priority, cleanup=cleanup)
+    except queue.Full:
+        cleanup()
+        response = jsonify({"error": "Job queue is full, retry later"})
+        response.headers['Retry-After'] = str(settings.JOB_RETRY_AFTER)
+        return response, 429
+    return jsonify(record), 202
+
+@api_routes.route("/jobs/<job_id>", methods=['GET'])
+def job_status(job_id):
+    record = job_manager.get(job_id)
+    if record is None: return jsonify({"error": "Unknown job"}), 404
+    return jsonify(record)
+
+@api_routes.route("/jobs/<job_id>/result", methods=['GET'])
+def job_result(job_id):
+    record = job_manager.get(job_id)
+    if record is None: return jsonify({"error": "Unknown job"}), 404
+    if record["status"] != 'done':
+        return jsonify({"error": f"Job is {record['status']}", "status": record["status"]}), 409
+    return jsonify({"filename": record["filename"], **job_manager.result(job_id)})
+
+@api_routes.route("/jobs/<job_id>", methods=['DELETE'])
+def cancel_job(job_id):
+    record = job_manager.cancel(job_id)
+    if record is None: return jsonify({"error": "Unknown job"}), 404
+    return jsonify(record)
+
+@api_routes.route("/templates", methods=['GET'])
+def list_templates():
+    return jsonify({"templates": [template.to_dict() for template in template_registry.list()]})
+
+@api_routes.route("/templates/<name>", methods=['GET'])
+def get_template(name):
+    template = template_registry.get(name)
+    if template is None: return jsonify({"error": "Unknown template"}), 404
+    return jsonify(template.to_dict())
+
+@api_routes.route("/templates/<name>", methods=['PUT'])
+def put_template(name):
+    try:
+        template = Template.from_dict(name, request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(template_registry.save(template).to_dict())
+
+@api_routes.route("/templates/<name>", methods=['DELETE'])
+def delete_template(name):
+    if not template_registry.delete(name): return jsonify({"error": "Unknown template"}), 404
+    return jsonify({"deleted": name})
+
+@api_routes.route("/cache/stats", methods=['GET'])
+def cache_stats():
+    return jsonify({"results": result_cache.stats()})
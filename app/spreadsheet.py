@@ -0,0 +1,143 @@
+"""Streaming Excel reader"""
+import math
+import zipfile
+from itertools import dropwhile, islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from .lazy import lazy_import
+from .uploads import DocumentSource, Source
+
+openpyxl = lazy_import('openpyxl')
+pd = lazy_import('pandas')
+
+Record = Dict[str, Any]
+
+class SheetReader:
+    """Reads workbooks row by row through openpyxl's read-only mode.
+
+    Only the row being converted plus the caller's current batch are resident, so memory
+    stays flat however large the workbook is. The first non-blank row of each sheet is the
+    header, blank rows after the last data row are dropped (blank rows in between are kept)
+    and empty cells become ``""`` by default, as with ``pd.read_excel(...).fillna("")``. Legacy ``.xls`` files have no streaming reader and
+    are parsed through pandas.
+    """
+
+    @staticmethod
+    def column_names(header: Sequence[Any]) -> List[str]:
+        """Header cells as pandas names them: ``Unnamed: <i>`` for blanks, ``name.1`` for repeats"""
+        names, seen = [], {}
+        for index, cell in enumerate(header):
+            name = f"Unnamed: {index}" if cell is None or cell == "" else str(cell)
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            seen.setdefault(name, 0)
+            names.append(name)
+        return names
+
+    @staticmethod
+    def select_sheets(names: List[str], sheets: Optional[Sequence[str]] = None) -> List[str]:
+        """Resolve sheet names or 1-based sheet numbers, in the order given"""
+        if not sheets:
+            return list(names)
+        selected = []
+        for sheet in sheets:
+            if sheet in names:
+                selected.append(sheet)
+            elif str(sheet).isdigit() and 1 <= int(sheet) <= len(names):
+                selected.append(names[int(sheet) - 1])
+            else:
+                raise ValueError(f"Unknown sheet: {sheet}")
+        return selected
+
+    @staticmethod
+    def _frame_rows(df: "pd.DataFrame") -> Iterator[tuple]:
+        for row in df.itertuples(index=False, name=None):
+            yield tuple(None if isinstance(value, float) and math.isnan(value) else value for value in row)
+
+    @staticmethod
+    def _is_blank(row: tuple) -> bool:
+        return all(value is None or value == "" for value in row)
+
+    @classmethod
+    def _data_rows(cls, rows: Iterator[tuple]) -> Iterator[tuple]:
+        """``rows`` without the blank rows at the end. A run of blank rows is only counted until
+        the next data row shows it is interior; it is then emitted as empty rows."""
+        blanks = 0
+        for row in rows:
+            if cls._is_blank(row):
+                blanks += 1
+                continue
+            for _ in range(blanks):
+                yield ()
+            blanks = 0
+            yield row
+
+    @classmethod
+    def records(cls, rows: Iterator[tuple], start: int = 0, stop: Optional[int] = None,
+                columns: Optional[Sequence[str]] = None, empty: Any = "") -> Iterator[Record]:
+        """Records for data rows ``start..stop`` (0-based, header excluded), projected onto ``columns``.
+
+        Empty cells are filled with ``empty``.
+        """
+        rows = dropwhile(cls._is_blank, rows)
+        header = next(rows, None)
+        if header is None:
+            return
+        rows = cls._data_rows(rows)
+        names = cls.column_names(header)
+        if columns:
+            missing = [column for column in columns if column not in names]
+            if missing:
+                raise ValueError(f"Unknown columns: {', '.join(missing)}")
+            indices = [names.index(column) for column in columns]
+        else:
+            indices = range(len(names))
+        keys = [names[index] for index in indices]
+        for row in islice(rows, start, stop):
+            values = [row[index] if index < len(row) else None for index in indices]
+            yield {key: empty if value is None else value for key, value in zip(keys, values)}
+
+    @classmethod
+    def iter_sheets(cls, file_path: Source, sheets: Optional[Sequence[str]] = None, start: int = 0,
+                    stop: Optional[int] = None, columns: Optional[Sequence[str]] = None, empty: Any = ""
+                    ) -> Iterator[Tuple[str, Iterator[Record]]]:
+        """Yield (sheet name, records) for each selected sheet.
+
+        Like ``itertools.groupby``, a sheet's records must be consumed before moving to the next.
+        """
+        if zipfile.is_zipfile(DocumentSource.open(file_path)):
+            workbook = openpyxl.load_workbook(DocumentSource.open(file_path), read_only=True, data_only=True)
+            names, close = workbook.sheetnames, workbook.close
+            rows_of = lambda name: workbook[name].iter_rows(values_only=True)
+        else:
+            workbook = pd.ExcelFile(DocumentSource.open(file_path))
+            names, close = workbook.sheet_names, workbook.close
+            rows_of = lambda name: cls._frame_rows(workbook.parse(name, header=None))
+        try:
+            for name in cls.select_sheets(names, sheets):
+                yield name, cls.records(iter(rows_of(name)), start, stop, columns, empty)
+        finally:
+            close()
+
+    @classmethod
+    def read(cls, file_path: Source, **selection) -> Dict[str, List[Record]]:
+        """All selected rows, keyed by sheet name"""
+        return {name: list(records) for name, records in cls.iter_sheets(file_path, **selection)}
+
+    @classmethod
+    def iter_chunks(cls, file_path: Source, chunk_rows: int, **selection) -> Iterator[Tuple[str, int, List[Record]]]:
+        """Yield (sheet name, first row number, records) in batches of at most ``chunk_rows`` rows.
+
+        Row numbers are 1-based data rows. A sheet with no selected rows yields one empty batch.
+        """
+        first_row = selection.get('start', 0) + 1
+        for name, records in cls.iter_sheets(file_path, **selection):
+            row, emitted = first_row, False
+            while True:
+                batch = list(islice(records, chunk_rows))
+                if not batch and emitted:
+                    break
+                yield name, row, batch
+                row, emitted = row + len(batch), True
+                if len(batch) < chunk_rows:
+                    break
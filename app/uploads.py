@@ -0,0 +1,72 @@
+"""Uploaded documents kept in memory, spilling to a temp file only when they are large"""
+import io
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Iterator, Union
+from flask import Request
+from config import settings
+
+# A document as its bytes (small uploads) or as the path of a temp file holding it
+Source = Union[bytes, str]
+
+class SpooledRequest(Request):
+    """Request whose file parts are buffered in memory up to ``settings.UPLOAD_SPOOL_BYTES``.
+
+    Werkzeug's default writes any body over 500 KB to a temp file while parsing the form.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_SPOOL_BYTES)
+
+class DocumentSource:
+    """Helpers for passing a document around as bytes or a path.
+
+    pdfplumber, openpyxl and pandas read the bytes directly; only poppler needs a file, so
+    ``as_path`` writes one for as long as rendering takes. Uploads over the spool size are
+    written to a temp file once, when they are received.
+    """
+
+    @staticmethod
+    def spool(stream: IO[bytes], size: int, suffix: str = '') -> Source:
+        if size <= settings.UPLOAD_SPOOL_BYTES:
+            return stream.read()
+        temp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+        with temp:
+            shutil.copyfileobj(stream, temp)
+        return temp.name
+
+    @classmethod
+    def receive(cls, file, suffix: str = '') -> Source:
+        """The upload's bytes, or the path of a temp file for uploads over the spool size"""
+        stream = file.stream
+        stream.seek(0, os.SEEK_END)
+        size = stream.tell()
+        stream.seek(0)
+        return cls.spool(stream, size, suffix)
+
+    @staticmethod
+    def open(source: Source) -> Union[IO[bytes], str]:
+        """Something pdfplumber, openpyxl and pandas can open: the path, or a buffer over the bytes"""
+        return io.BytesIO(source) if isinstance(source, bytes) else source
+
+    @staticmethod
+    @contextmanager
+    def as_path(source: Source, suffix: str = '.pdf') -> Iterator[str]:
+        """A filesystem path for ``source``; bytes are written to a temp file for the duration"""
+        if not isinstance(source, bytes):
+            yield source
+            return
+        temp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+        try:
+            with temp:
+                temp.write(source)
+            yield temp.name
+        finally:
+            os.unlink(temp.name)
+
+    @staticmethod
+    def discard(source: Source) -> None:
+        if isinstance(source, str) and os.path.exists(source):
+            os.unlink(source)
@@ -1,63 +1,271 @@
+import hashlib
+import io
 import os
-import pytesseract
+import shlex
+import subprocess
 import numpy as np
-import cv2
-import pdfplumber
-import pandas as pd
-from typing import List, Dict, Union
+from PIL import Image
+from typing import Iterator, List, Sequence, Tuple, Union
+from .lazy import lazy_import
+from .ocr import TesseractPool
+from .preprocessing import Preprocessor
+from .spreadsheet import SheetReader
+from .uploads import DocumentSource, Source
+
+cv2 = lazy_import('cv2')
+pd = lazy_import('pandas')
+pdfplumber = lazy_import('pdfplumber')
+pytesseract = lazy_import('pytesseract')
+
+ImageInput = Union[str, np.ndarray, Image.Image]
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(starts, ends) of the runs of True in a 1-D boolean mask"""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return edges[::2], edges[1::2]
+
+# Column layout of Tesseract's TSV output (pytesseract.image_to_data)
+TSV_COLUMNS = ['level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+               'left', 'top', 'width', 'height', 'conf', 'text']
+LINE_KEYS = ['page_num', 'block_num', 'par_num', 'line_num']
 
 class ExtractionUtils:
     @staticmethod
-    def validate_pdf(file_path: str) -> bool:
+    def validate_pdf(file_path: Source) -> bool:
         try:
-            with pdfplumber.open(file_path) as pdf:
+            with pdfplumber.open(DocumentSource.open(file_path)) as pdf:
                 return len(pdf.pages) > 0
         except Exception:
             return False
 
     @staticmethod
-    def validate_excel(file_path: str) -> bool:
+    def validate_excel(file_path: Source) -> bool:
         """Validate Excel file integrity"""
         try:
-            pd.read_excel(file_path, nrows=1)
+            next(SheetReader.iter_sheets(file_path), None)
             return True
         except Exception:
             return False
 
     @staticmethod
-    def preprocess_image(image_path: str) -> np.ndarray:
-        img = cv2.imread(image_path)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        thresh = cv2.adaptiveThreshold(
-            gray, 255, 
-            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY, 11, 2
-        )
-        return cv2.fastNlMeansDenoising(thresh, None, 10, 7, 21)
+    def to_grayscale(image: ImageInput) -> np.ndarray:
+        """Return an 8-bit grayscale array from a path, PIL image or BGR/gray array"""
+        if isinstance(image, str):
+            return cv2.imread(image, cv2.IMREAD_GRAYSCALE)
+        if isinstance(image, Image.Image):
+            return np.asarray(image.convert('L'))
+        if image.ndim == 3:
+            return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return image
+
+    @staticmethod
+    def image_fingerprint(image: Union[np.ndarray, Image.Image]) -> str:
+        """SHA-256 over the raw pixels and geometry of an in-memory image"""
+        pixels = np.ascontiguousarray(np.asarray(image))
+        digest = hashlib.sha256(repr((pixels.shape, pixels.dtype.str)).encode())
+        digest.update(pixels.data)
+        return digest.hexdigest()
+
+    @staticmethod
+    def preprocess_image(image: ImageInput, pipeline: str = None) -> np.ndarray:
+        """Binarize a page for OCR with a preprocessing pipeline (``settings.PREPROCESS_PIPELINE`` by default)"""
+        processed, _ = Preprocessor.run(ExtractionUtils.to_grayscale(image), pipeline)
+        return processed
+
+    @staticmethod
+    def encode_image(image: Union[np.ndarray, Image.Image]) -> bytes:
+        """Encode an in-memory image as uncompressed PNM for Tesseract's stdin (lossless, no temp file)"""
+        if isinstance(image, Image.Image):
+            image = cv2.cvtColor(np.asarray(image.convert('RGB')), cv2.COLOR_RGB2BGR)
+        ok, buffer = cv2.imencode('.pnm', image)
+        if not ok:
+            raise ValueError("Could not encode image for Tesseract")
+        return buffer.tobytes()
+
+    @staticmethod
+    def run_tesseract(image: Union[np.ndarray, Image.Image], language: str = 'eng', config: str = '',
+                      output: str = 'txt') -> str:
+        """Pipe an in-memory image through ``tesseract stdin stdout`` and return the raw output"""
+        args = [pytesseract.pytesseract.tesseract_cmd, 'stdin', 'stdout', '-l', language]
+        args += shlex.split(config)
+        if output == 'tsv':
+            args.append('tsv')
+        proc = subprocess.run(args, input=ExtractionUtils.encode_image(image), capture_output=True)
+        if proc.returncode != 0:
+            raise pytesseract.TesseractError(proc.returncode, proc.stderr.decode(errors='replace').strip())
+        return proc.stdout.decode('utf-8', errors='replace')
+
+    @staticmethod
+    def tesseract_output(image: Union[np.ndarray, Image.Image], language: str = 'eng', config: str = '',
+                         output: str = 'txt') -> str:
+        """OCR an in-memory image as plain text (``'txt'``) or word boxes (``'tsv'``)"""
+        if isinstance(image, Image.Image):
+            if image.mode in ('1', 'L'):
+                image = np.asarray(image.convert('L'))
+            else:
+                image = cv2.cvtColor(np.asarray(image.convert('RGB')), cv2.COLOR_RGB2BGR)
+        # Prefer a warm in-process engine; spawn the CLI only when tesserocr is unavailable
+        text = TesseractPool.run(image, language=language, config=config, output=output)
+        if text is None:
+            text = ExtractionUtils.run_tesseract(image, language=language, config=config, output=output)
+        return text
 
     @staticmethod
-    def extract_text_with_tesseract(image_path: str, language: str = 'eng', custom_config: str = '') -> str:
+    def run_tesseract_batch(images: Sequence[np.ndarray], language: str = 'eng', config: str = '') -> List[str]:
+        """OCR several images with one ``tesseract`` process, piped in as a multi-page TIFF.
+
+        Tesseract ends the text of every page with a form feed; should the output not split into
+        one text per image, the images are OCR'd one by one instead.
+        """
+        if len(images) == 1:
+            return [ExtractionUtils.run_tesseract(images[0], language=language, config=config)]
+        frames = [Image.fromarray(image) for image in images]
+        buffer = io.BytesIO()
+        frames[0].save(buffer, format='TIFF', save_all=True, append_images=frames[1:])
+        args = [pytesseract.pytesseract.tesseract_cmd, 'stdin', 'stdout', '-l', language] + shlex.split(config)
+        proc = subprocess.run(args, input=buffer.getvalue(), capture_output=True)
+        texts = proc.stdout.decode('utf-8', errors='replace').split('\f')
+        if proc.returncode == 0 and len(texts) == len(images) + 1:
+            return texts[:-1]
+        return [ExtractionUtils.run_tesseract(image, language=language, config=config) for image in images]
+
+    @staticmethod
+    def tesseract_outputs(images: Sequence[np.ndarray], language: str = 'eng', config: str = '') -> List[str]:
+        """Plain text of several in-memory images that share a language and config"""
+        if not images:
+            return []
+        texts = TesseractPool.run_many(images, language=language, config=config)
+        if texts is None:
+            texts = ExtractionUtils.run_tesseract_batch(images, language=language, config=config)
+        return texts
+
+    @staticmethod
+    def extract_text_with_tesseract(image: ImageInput, language: str = 'eng', custom_config: str = '') -> str:
         default_config = '--oem 3 --psm 6 '
         config = default_config + custom_config
-        text = pytesseract.image_to_string(image_path, lang=language, config=config)
-        return text.strip()
+        if isinstance(image, str):
+            return pytesseract.image_to_string(image, lang=language, config=config).strip()
+        return ExtractionUtils.tesseract_output(image, language=language, config=config).strip()
+
+    @staticmethod
+    def extract_words_with_tesseract(image: Union[np.ndarray, Image.Image], language: str = 'eng',
+                                     custom_config: str = '') -> "pd.DataFrame":
+        """Word-level boxes (``image_to_data`` columns) for the recognized, non-blank words"""
+        config = '--oem 3 --psm 6 ' + custom_config
+        tsv = ExtractionUtils.tesseract_output(image, language=language, config=config, output='tsv')
+        rows = [line.split('\t') for line in tsv.splitlines() if line and not line.startswith('level')]
+        words = pd.DataFrame([row for row in rows if len(row) == 12], columns=TSV_COLUMNS)
+        numeric = TSV_COLUMNS[:-1]
+        words[numeric] = words[numeric].apply(pd.to_numeric, errors='coerce')
+        words = words[(words['level'] == 5) & (words['text'].str.strip() != '')]
+        return words.reset_index(drop=True)
 
     @staticmethod
-    def extract_pdf_with_plumber(file_path: str) -> str:
-        text = ""
-        with pdfplumber.open(file_path) as pdf:
+    def layout_fingerprint(image: ImageInput, hash_size: int = 16) -> str:
+        """Difference hash of the downscaled page: stable across documents filled in on the same template"""
+        gray = ExtractionUtils.to_grayscale(image)
+        small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+        bits = np.packbits(small[:, 1:] > small[:, :-1])
+        aspect = round(gray.shape[0] / gray.shape[1], 2)
+        return f"{aspect}:{bits.tobytes().hex()}"
+
+    @staticmethod
+    def detect_gutters(binary: np.ndarray, min_gap: float = 0.02, ink_ratio: float = 0.1,
+                       max_gutters: int = 4, rule_ratio: float = 0.9) -> List[float]:
+        """Find column gutters in a binarized page (dark ink on white) from its vertical projection profile.
+
+        A gutter is a run of at least ``min_gap`` x page width between the outermost inked
+        columns whose smoothed ink density stays below ``ink_ratio`` x the mean density, so
+        headings that span the columns don't hide it. Rules (rows with an unbroken run of ink
+        over ``rule_ratio`` of the inked width, e.g. separators and table borders) are dropped
+        before projecting, as on a sparse page a few of them would fill the gutters. Returns
+        gutter centres as fractions of the page width, usable as column partitions.
+        """
+        height, width = binary.shape[:2]
+        dark = binary < 128
+        inked = np.flatnonzero(dark.any(axis=0))
+        if inked.size == 0:
+            return []
+        span = rule_ratio * (inked[-1] - inked[0] + 1)
+        for row in np.flatnonzero(dark.sum(axis=1) >= span):
+            starts, ends = _runs(dark[row])
+            if (ends - starts).max() >= span:
+                dark[row] = False
+        profile = dark.sum(axis=0) / float(height)
+        inked = np.flatnonzero(profile > 0)
+        if inked.size == 0:
+            return []
+        left, right = inked[0], inked[-1]
+
+        window = max(3, int(width * 0.005))
+        smooth = np.convolve(profile, np.ones(window) / window, mode='same')
+        empty = smooth <= ink_ratio * smooth[left:right + 1].mean()
+        empty[:left + 1] = False
+        empty[right:] = False
+
+        starts, ends = _runs(empty)
+        # A gutter needs at least a column's worth of content on both sides
+        margin = min_gap * width
+        keep = ((ends - starts) >= margin) & (starts >= left + margin) & (ends <= right - margin)
+        starts, ends = starts[keep], ends[keep]
+
+        widest = np.argsort(ends - starts)[::-1][:max_gutters]
+        return sorted(round(float(starts[i] + ends[i]) / 2 / width, 4) for i in widest)
+
+    @staticmethod
+    def split_words_into_columns(words: "pd.DataFrame", page_width: int, partitions: List[float]) -> List[str]:
+        """Assign words to ``len(partitions) + 1`` columns by their horizontal centre.
+
+        ``partitions`` are column boundaries as fractions of the page width. Lines are
+        rebuilt per column in Tesseract's reading order, so a line that spans several
+        columns is split at the boundaries instead of being cut through its words.
+        """
+        boundaries = np.asarray(sorted(partitions), dtype=float) * page_width
+        centres = words['left'].to_numpy() + words['width'].to_numpy() / 2
+        column_index = np.searchsorted(boundaries, centres, side='right')
+
+        columns = []
+        for index in range(len(boundaries) + 1):
+            column_words = words[column_index == index].sort_values(LINE_KEYS + ['word_num'])
+            lines = column_words.groupby(LINE_KEYS, sort=True)['text'].agg(' '.join)
+            columns.append("\n".join(lines))
+        return columns
+
+    @staticmethod
+    def extract_pdf_with_plumber(file_path: Source) -> str:
+        return "".join(text + "\n" for text in ExtractionUtils.iter_pages_with_plumber(file_path))
+
+    @staticmethod
+    def iter_pages_with_plumber(file_path: Source, last_page: int = None,
+                                pages: Sequence[int] = None) -> Iterator[str]:
+        """Text layer of pages 1..last_page (or of the sorted page numbers in ``pages``), one page at a time.
+
+        Pages outside the selection are never parsed.
+        """
+        if pages is None and last_page is not None:
+            pages = range(1, last_page + 1)
+        with pdfplumber.open(DocumentSource.open(file_path), pages=list(pages) if pages is not None else None) as pdf:
             for page in pdf.pages:
-                text += (page.extract_text() or "") + "\n"
-        return text
+                yield page.extract_text() or ""
 
     @staticmethod
-    def extract_excel_with_pandas(file_path: str) -> Dict[str, List[Dict]]:
-        """Extracts all sheets from Excel as a dictionary of records"""
-        xls = pd.ExcelFile(file_path)
-        output = {}
-        for sheet_name in xls.sheet_names:
-            df = pd.read_excel(xls, sheet_name=sheet_name)
-            # Clean NaN values to make it JSON serializable
-            df = df.fillna("")
-            output[sheet_name] = df.to_dict(orient='records')
-        return output
+    def extract_pages_with_plumber(file_path: Source, last_page: int = None) -> List[str]:
+        """Text layer of pages 1..last_page, one string per page"""
+        return list(ExtractionUtils.iter_pages_with_plumber(file_path, last_page))
+
+    @staticmethod
+    def is_usable_text_layer(text: str, min_chars: int = 20) -> bool:
+        """Heuristic: does an embedded text layer look complete enough to skip OCR?
+
+        Rejects near-empty pages (scans, image-only pages), unmapped glyphs that
+        pdfminer reports as ``(cid:NN)`` and text dominated by unprintable or
+        replacement characters (broken font encodings).
+        """
+        stripped = "".join(text.split())
+        if len(stripped) < min_chars:
+            return False
+        cid_chars = text.count("(cid:") * len("(cid:00)")
+        if cid_chars > len(stripped) * 0.1:
+            return False
+        readable = sum(1 for ch in stripped if ch.isprintable() and ch != "\ufffd")
+        return readable / len(stripped) >= 0.9
@@ -0,0 +1,26 @@
+"""Loading the extraction engines before the first request"""
+import time
+from typing import Dict, Optional, Sequence
+from .lazy import load
+from .ocr import TesseractPool
+from config import settings
+
+# Everything the extraction paths defer until first use (see lazy_import)
+ENGINE_MODULES = ['cv2', 'pandas', 'openpyxl', 'pdfplumber', 'pdfminer.pdftypes', 'pdf2image', 'pytesseract']
+
+def preload_engines(languages: Optional[Sequence[str]] = None) -> Dict[str, float]:
+    """Import every engine and initialize a Tesseract engine per language; returns seconds per step.
+
+    Under ``gunicorn --preload`` this runs once in the master, so forked workers (and the page
+    engine processes they fork in turn) start with the modules and traineddata already in memory.
+    """
+    timings = {}
+    for name in ENGINE_MODULES:
+        start = time.perf_counter()
+        load(name)
+        timings[name] = time.perf_counter() - start
+    for language in settings.PRELOAD_LANGUAGES if languages is None else languages:
+        start = time.perf_counter()
+        TesseractPool.warm(language)
+        timings[f"tesseract:{language}"] = time.perf_counter() - start
+    return timings
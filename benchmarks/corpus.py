@@ -0,0 +1,90 @@
+"""Synthetic benchmark documents, generated with FPDF the same way as tests/test_api.create_test_pdf"""
+import os
+import tempfile
+import numpy as np
+import cv2
+import pandas as pd
+from fpdf import FPDF
+
+WORDS = ("invoice statement account balance payment total amount customer reference date "
+         "period summary charges credit debit terms conditions service number address").split()
+
+def _sentence(rng: np.random.Generator, words: int = 12) -> str:
+    return " ".join(rng.choice(WORDS, size=words)).capitalize() + "."
+
+def _temp_path(suffix: str) -> str:
+    temp_fd, temp_path = tempfile.mkstemp(suffix=suffix)
+    os.close(temp_fd)
+    return temp_path
+
+def digital_text_pdf(pages: int = 5, seed: int = 0) -> str:
+    """Text-layer PDF, one paragraph block per page"""
+    rng = np.random.default_rng(seed)
+    pdf = FPDF()
+    pdf.set_font("Arial", size=11)
+    for _ in range(pages):
+        pdf.add_page()
+        for _ in range(40):
+            pdf.cell(190, 6, txt=_sentence(rng), ln=True, align='L')
+    temp_path = _temp_path('.pdf')
+    pdf.output(temp_path)
+    return temp_path
+
+def two_column_pdf(pages: int = 3, seed: int = 0) -> str:
+    """Text-layer PDF with two columns separated by a gutter"""
+    rng = np.random.default_rng(seed)
+    pdf = FPDF()
+    pdf.set_font("Arial", size=10)
+    for _ in range(pages):
+        pdf.add_page()
+        for row in range(45):
+            y = 15 + row * 6
+            pdf.text(10, y, _sentence(rng, 7))
+            pdf.text(115, y, _sentence(rng, 7))
+    temp_path = _temp_path('.pdf')
+    pdf.output(temp_path)
+    return temp_path
+
+def scanned_noise_pdf(pages: int = 3, noise: float = 12.0, seed: int = 0) -> str:
+    """Image-only PDF: rasterized text with Gaussian noise and no text layer"""
+    rng = np.random.default_rng(seed)
+    pdf = FPDF()
+    image_paths = []
+    try:
+        for _ in range(pages):
+            page = np.full((2339, 1654), 255, np.uint8)
+            for row in range(45):
+                cv2.putText(page, _sentence(rng, 8), (120, 160 + row * 46), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 0, 2)
+            page = np.clip(page + rng.normal(0, noise, page.shape), 0, 255).astype(np.uint8)
+            image_path = _temp_path('.png')
+            cv2.imwrite(image_path, page)
+            image_paths.append(image_path)
+            pdf.add_page()
+            pdf.image(image_path, x=0, y=0, w=210, h=297)
+        temp_path = _temp_path('.pdf')
+        pdf.output(temp_path)
+    finally:
+        for image_path in image_paths:
+            os.unlink(image_path)
+    return temp_path
+
+def excel_workbook(rows: int = 20000, sheets: int = 2, seed: int = 0) -> str:
+    rng = np.random.default_rng(seed)
+    temp_path = _temp_path('.xlsx')
+    with pd.ExcelWriter(temp_path) as writer:
+        for index in range(sheets):
+            pd.DataFrame({
+                "id": np.arange(rows),
+                "customer": rng.choice(WORDS, size=rows),
+                "amount": rng.normal(100, 25, size=rows).round(2),
+                "paid": rng.random(rows) > 0.3,
+            }).to_excel(writer, sheet_name=f"Sheet{index + 1}", index=False)
+    return temp_path
+
+CORPUS = {
+    "digital-text": lambda: digital_text_pdf(pages=5),
+    "many-page": lambda: digital_text_pdf(pages=50),
+    "two-column": lambda: two_column_pdf(pages=3),
+    "scanned-noise": lambda: scanned_noise_pdf(pages=3),
+    "excel-large": lambda: excel_workbook(rows=20000),
+}
@@ -0,0 +1,188 @@
+"""Offline extraction benchmarks.
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --compare bench.json --threshold 0.2
+
+Generates the synthetic corpus, times PDFExtractor's standard, OCR, hybrid, column and
+Excel paths (wall time plus per-stage time summed over pages) and the cold start of a fresh
+interpreter, and writes machine-readable results. With ``--compare`` the run fails (exit code 1) if any case got slower than the
+baseline by more than ``--threshold``. Caches are disabled unless ``--with-cache`` is given.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# Make the project importable when run from anywhere, as tests/test_api.py does
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from config import settings
+from benchmarks.corpus import CORPUS
+
+CASES = [
+    ("standard", "digital-text"),
+    ("standard", "many-page"),
+    ("ocr", "digital-text"),
+    ("ocr", "scanned-noise"),
+    ("hybrid", "digital-text"),
+    ("hybrid", "scanned-noise"),
+    ("columns", "two-column"),
+    ("excel", "excel-large"),
+    ("startup", "cold-start"),
+]
+
+# Run in a fresh interpreter: build the app as gunicorn does (engines deferred), then load the engines
+COLD_START = (
+    "import json, time; start = time.perf_counter(); import config; config.PRELOAD_ENGINES = False; "
+    "import run; timings = {'app': time.perf_counter() - start}; "
+    "from app.warmup import preload_engines; timings.update(preload_engines()); print(json.dumps(timings))"
+)
+
+def cold_start():
+    """Seconds to import and create the app, then to load each engine, in a new process"""
+    output = subprocess.run([sys.executable, "-c", COLD_START], cwd=project_root, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+def run_case(mode, path):
+    """Run one extraction; returns summed per-stage seconds for paged modes, plus the page count
+    and the image bytes kept in memory between stages (``buffer_bytes``)"""
+    from app.extraction import PDFExtractor
+
+    stages = defaultdict(float)
+    if mode == "startup":
+        return cold_start()
+    if mode == "standard":
+        PDFExtractor.extract_text_standard(path)
+    elif mode == "excel":
+        PDFExtractor.extract_excel(path)
+    else:
+        results = {
+            "ocr": PDFExtractor.extract_pages_ocr,
+            "hybrid": PDFExtractor.extract_pages_hybrid,
+            "columns": PDFExtractor.extract_pages_columns,
+        }[mode](path)
+        for result in results:
+            for stage, seconds in result.timings.items():
+                stages[stage] += seconds
+            stages["pages"] += 1
+            stages["buffer_bytes"] += result.buffer_bytes
+    return dict(stages)
+
+def clear_caches():
+    """Empty the page and layout caches here and in the page engine workers.
+
+    Each worker process has its own memory tier, so the pool is shut down and the next case
+    starts fresh workers (their start-up is part of the measured time, as on a cold worker).
+    """
+    from app.engine import PageEngine
+    from app.extraction import layout_cache, page_cache
+    page_cache.clear()
+    layout_cache.clear()
+    PageEngine.shutdown()
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=project_root, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(cases, repeat, with_cache):
+    documents = {}
+    results = {}
+    try:
+        for mode, document in cases:
+            if mode != "startup" and document not in documents:
+                documents[document] = CORPUS[document]()
+            name = f"{mode}/{document}"
+            walls, stages = [], {}
+            for _ in range(repeat):
+                if not with_cache:
+                    clear_caches()
+                start = time.perf_counter()
+                try:
+                    stages = run_case(mode, documents.get(document))
+                except Exception as e:
+                    results[name] = {"error": str(e)}
+                    break
+                walls.append(time.perf_counter() - start)
+            else:
+                results[name] = {"wall": statistics.median(walls), "runs": walls, "stages": stages}
+            buffered = f"{stages['buffer_bytes'] / 1e6:9.1f} MB in memory" if stages.get("buffer_bytes") else ""
+            print(f"{name:28s} {results[name].get('wall', float('nan')):9.3f}s {buffered} {results[name].get('error', '')}")
+    finally:
+        for path in documents.values():
+            if os.path.exists(path): os.unlink(path)
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            "OCR_MAX_WORKERS": settings.OCR_MAX_WORKERS,
+            "OCR_WORKERS_PER_REQUEST": settings.OCR_WORKERS_PER_REQUEST,
+            "PREPROCESS_PIPELINE": settings.PREPROCESS_PIPELINE,
+            "RENDER_DPI": settings.RENDER_DPI,
+            "RENDER_ADAPTIVE_DPI": settings.RENDER_ADAPTIVE_DPI,
+            "RENDER_MAX_PAGE_PIXELS": settings.RENDER_MAX_PAGE_PIXELS,
+            "PRELOAD_LANGUAGES": settings.PRELOAD_LANGUAGES,
+        },
+        "repeat": repeat,
+        "cases": results,
+    }
+
+def compare(current, baseline, threshold):
+    """Print per-case ratios against a baseline; returns the names of regressed cases"""
+    regressions = []
+    for name, result in current["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if not base or "wall" not in base or "wall" not in result:
+            continue
+        ratio = result["wall"] / base["wall"] if base["wall"] else float("inf")
+        flag = "REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{name:28s} {base['wall']:9.3f}s -> {result['wall']:9.3f}s  x{ratio:5.2f} {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DataXtractor extraction benchmarks")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON from a previous run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown ratio (0.2 = 20%%)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cases", help="comma-separated subset, e.g. ocr/scanned-noise,standard/many-page")
+    parser.add_argument("--with-cache", action="store_true", help="keep page/layout caches between runs")
+    args = parser.parse_args(argv)
+
+    if not args.with_cache:
+        settings.CACHE_DIR = None
+    cases = CASES
+    if args.cases:
+        wanted = set(args.cases.split(","))
+        cases = [case for case in CASES if "/".join(case) in wanted]
+
+    results = run(cases, args.repeat, args.with_cache)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
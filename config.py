@@ -1,4 +1,7 @@
 """Application configuration settings"""
+import os
+import sys
+import tempfile
 
 # Project info
 PROJECT_NAME = "DataXtractor"
@@ -10,9 +13,90 @@ API_V1_STR = "/api/v1"
 HOST = "127.0.0.1"
 PORT = 8000
 DEBUG = True
+REQUEST_TIME_BUDGET = 240  # seconds of OCR work per request before partial results are returned (gunicorn --timeout is 300); None disables
 
 # OCR settings
 TESSERACT_PATH = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 POPPLER_PATH = r"c:\Users\fredd\DataXtractor 2.0\poppler\poppler-24.08.0\Library\bin"
 SUPPORTED_LANGUAGES = ["eng", "spa"]
 MAX_PAGES = 50
+TESSERACT_POOL_SIZE = 4  # warm tesserocr engines kept per process (needs the optional tesserocr package)
+MAX_COLUMNS = 5  # upper bound for automatic column detection
+HYBRID_MIN_CHARS = 20  # pages with less embedded text than this are OCR'd in hybrid mode
+
+# Preprocessing settings
+PREPROCESS_PIPELINE = "auto"  # 'auto', a named pipeline (legacy, clean, light, noisy) or "stage,stage,..."
+PREPROCESS_AUTO = [("clean", 1.5), ("light", 6.0), ("noisy", float("inf"))]  # (pipeline, max noise sigma)
+PREPROCESS_MAX_WIDTH = 2480  # pages wider than this (A4 at 300 DPI) are downscaled before OCR
+
+# Page engine settings
+WEB_WORKERS = 4  # gunicorn --workers, see Dockerfile
+OCR_MAX_WORKERS = max(1, (os.cpu_count() or 1) // WEB_WORKERS)  # pool size per web worker
+OCR_WORKERS_PER_REQUEST = OCR_MAX_WORKERS  # pages in flight for a single request
+TEXT_SHARD_PAGES = 25  # pages per text-layer task; longer digital PDFs are parsed in parallel shards
+OCR_THREADS = 1  # OpenMP threads per Tesseract (OMP_THREAD_LIMIT); parallelism comes from the page engine
+CV2_THREADS = 1  # OpenCV threads per process, for the same reason
+
+# Startup settings
+PRELOAD_ENGINES = False  # load every extraction engine when the app is created instead of on first use (pair with gunicorn --preload)
+PRELOAD_LANGUAGES = ["eng"]  # Tesseract languages initialized by the preload
+
+# Admission control settings
+ADMISSION_DIR = os.path.join(tempfile.gettempdir(), "dataxtractor-admission")  # slot lock files shared by all web workers
+ADMISSION_SLOTS = None  # concurrent OCR requests per host; None sizes it from CPUs and memory
+ADMISSION_MEMORY_PER_SLOT = 1024 * 1024 * 1024  # memory set aside per admitted OCR request
+ADMISSION_WAIT = 2.0  # seconds a request waits for a slot before getting 429
+ADMISSION_RETRY_AFTER = 5
+
+# Rendering settings
+RENDER_DPI = 200  # pdf2image default; used for pages without measurable text (or with adaptive DPI off)
+RENDER_WINDOW_PAGES = 2  # pages per pdftoppm call
+RENDER_PIXEL_BUDGET = 60_000_000  # max rendered pixels held per request (~60 MB grayscale)
+RENDER_ADAPTIVE_DPI = True  # pick each page's DPI from the text height measured on a low-resolution probe
+RENDER_PROBE_DPI = 72
+RENDER_TEXT_HEIGHT_PX = 16  # target height of the measured line body in pixels (11 pt body text -> 200 DPI)
+RENDER_MIN_DPI = 100
+RENDER_MAX_DPI = 300  # A4 at 300 DPI is PREPROCESS_MAX_WIDTH wide, so small print is not downscaled again
+RENDER_DPI_STEP = 25
+RENDER_MAX_PAGE_PIXELS = 25_000_000  # no single page is rendered larger (an A0 sheet drops to ~125 DPI)
+
+# Upload settings
+MAX_FILE_SIZE_MB = 50  # larger request bodies (batches included) are rejected with 413 while being received
+MAX_UPLOAD_PAGES = 500  # PDFs with more pages are rejected before any rendering (MAX_PAGES still caps OCR)
+UPLOAD_SPOOL_BYTES = 16 * 1024 * 1024  # uploads up to this size are processed from memory, never written to disk
+
+# Batch settings
+BATCH_MAX_FILES = 200  # documents per /extract/batch request, ZIP members included
+BATCH_MAX_BYTES = 512 * 1024 * 1024  # uncompressed size of the PDFs unpacked from one ZIP upload
+
+# Excel settings
+EXCEL_CHUNK_ROWS = 1000  # rows per streamed NDJSON record
+
+# Cache settings
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "dataxtractor-cache")  # None disables the disk tier
+RESULT_CACHE_ITEMS = 64  # whole-document results kept in memory per web worker
+RESULT_CACHE_MEMORY_BYTES = 64 * 1024 * 1024  # JSON size of the results held in memory; larger results are only cached on disk
+RESULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+PAGE_CACHE_ITEMS = 1024  # OCR'd pages kept in memory per OCR worker process
+PAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+LAYOUT_CACHE_ITEMS = 512  # detected column layouts per template fingerprint
+LAYOUT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+LAYOUT_HASH_SIZE = 16  # difference-hash grid used as the template fingerprint
+
+# Background job settings
+JOB_DIR = os.path.join(tempfile.gettempdir(), "dataxtractor-jobs")  # shared by all web workers
+JOB_WORKERS = 2  # job threads per web worker (OCR itself runs on the page engine pool)
+JOB_QUEUE_SIZE = 32  # queued jobs per web worker before submissions get 429
+JOB_TTL = 3600  # seconds job state and results are kept
+JOB_RETRY_AFTER = 30
+
+# Form template settings
+TEMPLATE_DIR = os.path.join(tempfile.gettempdir(), "dataxtractor-templates")  # shared by all web workers
+TEMPLATE_MAX_REGIONS = 64  # regions per template
+TEMPLATE_REGION_MARGIN = 10  # white pixels padded around each crop before OCR
+
+# Metrics settings
+METRICS_DIR = os.path.join(tempfile.gettempdir(), "dataxtractor-metrics")  # per-worker snapshots merged by /metrics
+
+# Attribute access for ``from config import settings``
+settings = sys.modules[__name__]
@@ -1,11 +1,9 @@
-from flask import Flask
 import config
+from app import create_app as create_api_app
 
 def create_app():
-    app = Flask(__name__)
-    
-    from app.routes import bp
-    app.register_blueprint(bp, url_prefix=config.API_V1_STR)
+    # API blueprint and /metrics come from the package factory
+    app = create_api_app()
     
     @app.route('/')
     def index():
@@ -22,8 +20,10 @@ def create_app():
     
     return app
 
+# WSGI entry point for gunicorn (run:app)
+app = create_app()
+
 if __name__ == '__main__':
-    app = create_app()
     app.run(
         host=config.HOST,
         port=config.PORT,
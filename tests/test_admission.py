@@ -0,0 +1,84 @@
+import io
+import subprocess
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+from fpdf import FPDF
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import run
+from app import routes
+from app.admission import AdmissionControl, Saturated, fcntl
+
+pytestmark = pytest.mark.skipif(fcntl is None, reason="admission control needs fcntl")
+
+# Holds one slot from another process until stdin is closed
+HOLDER = (
+    "import sys; from app.admission import AdmissionControl; "
+    "slot = AdmissionControl(sys.argv[1], 1).slot(); slot.__enter__(); print('held', flush=True); sys.stdin.read()"
+)
+
+def create_pdf():
+    """A one-page PDF with unique text, so its result is never cached"""
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    pdf.cell(200, 10, txt=f"Admission test {uuid.uuid4()}", ln=True)
+    return bytes(pdf.output(dest='S').encode('latin-1'))
+
+def test_slots_are_counted(tmp_path):
+    admission = AdmissionControl(str(tmp_path), 2)
+
+    with admission.slot(0), admission.slot(0):
+        assert admission.held == 2
+        with pytest.raises(Saturated) as error:
+            with admission.slot(0.1):
+                pass
+    assert error.value.retry_after == run.config.ADMISSION_RETRY_AFTER
+    assert admission.held == 0
+
+    with admission.slot(0):  # released slots can be taken again
+        assert admission.held == 1
+
+def test_slots_are_shared_across_processes(tmp_path):
+    holder = subprocess.Popen([sys.executable, "-c", HOLDER, str(tmp_path)], cwd=project_root,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == "held"
+        with pytest.raises(Saturated):
+            with AdmissionControl(str(tmp_path), 1).slot(0.1):
+                pass
+    finally:
+        holder.stdin.close()
+        holder.wait()
+
+    # The kernel released the lock when the holder exited
+    with AdmissionControl(str(tmp_path), 1).slot(0.1):
+        pass
+
+def test_saturated_request_gets_429(tmp_path, monkeypatch):
+    admission = AdmissionControl(str(tmp_path), 1)
+    monkeypatch.setattr(routes, "admission", admission)
+    monkeypatch.setattr("config.ADMISSION_WAIT", 0.1)
+    client = run.app.test_client()
+    url = f"{run.config.API_V1_STR}/extract/hybrid"
+
+    with admission.slot(0):
+        response = client.post(url, data={'file': (io.BytesIO(create_pdf()), 'test.pdf')})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == str(run.config.ADMISSION_RETRY_AFTER)
+
+    response = client.post(url, data={'file': (io.BytesIO(create_pdf()), 'test.pdf')})
+    assert response.status_code == 200
+    assert admission.held == 0
+
+def test_default_slots_override(monkeypatch):
+    monkeypatch.setattr("config.ADMISSION_SLOTS", 3)
+
+    assert AdmissionControl.default_slots() == 3
@@ -1,6 +1,8 @@
 import os
 import sys
 import tempfile
+import time
+import pandas as pd
 import requests
 from fpdf import FPDF
 from pathlib import Path
@@ -38,7 +40,7 @@ def create_test_pdf():
 def test_standard_extraction(test_pdf_path):
     """Test standard text extraction endpoint"""
     print("\n=== Standard Extraction Test ===")
-    url = f"http://{config.HOST}:{config.PORT}{config.API_V1_STR}/extract"
+    url = f"http://{config.HOST}:{config.PORT}{config.API_V1_STR}/extract/standard"
     
     with open(test_pdf_path, 'rb') as f:
         files = {'file': ('test.pdf', f, 'application/pdf')}
@@ -46,7 +48,8 @@ def test_standard_extraction(test_pdf_path):
     
     print(f"Status Code: {response.status_code}")
     print(f"Response: {response.json()}")
-    return response.status_code == 200
+    assert response.status_code == 200
+    assert "Hello" in response.json()["text"]
 
 def test_ocr_extraction(test_pdf_path):
     """Test OCR-based text extraction endpoint"""
@@ -60,7 +63,45 @@ def test_ocr_extraction(test_pdf_path):
     
     print(f"Status Code: {response.status_code}")
     print(f"Response: {response.json()}")
-    return response.status_code == 200
+    assert response.status_code == 200
+    assert "text" in response.json()
+
+def test_hybrid_extraction(test_pdf_path):
+    """Test hybrid (text layer + OCR fallback) extraction endpoint"""
+    print("\n=== Hybrid Extraction Test ===")
+    url = f"http://{config.HOST}:{config.PORT}{config.API_V1_STR}/extract/hybrid"
+    
+    with open(test_pdf_path, 'rb') as f:
+        files = {'file': ('test.pdf', f, 'application/pdf')}
+        data = {'language': 'eng'}
+        response = requests.post(url, files=files, data=data)
+    
+    print(f"Status Code: {response.status_code}")
+    print(f"Response: {response.json()}")
+    assert response.status_code == 200
+    assert [page["page"] for page in response.json()["pages"]] == [1]
+
+def test_page_selection(test_pdf_path):
+    """Test hybrid extraction of a page range"""
+    print("\n=== Page Selection Test ===")
+    url = f"http://{config.HOST}:{config.PORT}{config.API_V1_STR}/extract/hybrid"
+    
+    with open(test_pdf_path, 'rb') as f:
+        files = {'file': ('test.pdf', f, 'application/pdf')}
+        data = {'language': 'eng', 'first_page': '1', 'last_page': '1'}
+        response = requests.post(url, files=files, data=data)
+    
+    print(f"Status Code: {response.status_code}")
+    print(f"Response: {response.json()}")
+    assert response.status_code == 200
+    assert [page["page"] for page in response.json()["pages"]] == [1]
+    
+    with open(test_pdf_path, 'rb') as f:
+        files = {'file': ('test.pdf', f, 'application/pdf')}
+        response = requests.post(url, files=files, data={'pages': '2'})
+    
+    print(f"Out of range Status Code: {response.status_code}")
+    assert response.status_code == 400
 
 def test_column_extraction(test_pdf_path):
     """Test column-based text extraction endpoint"""
@@ -79,7 +120,93 @@ def test_column_extraction(test_pdf_path):
     
     print(f"Status Code: {response.status_code}")
     print(f"Response: {response.json()}")
-    return response.status_code == 200
+    assert response.status_code == 200
+    assert response.json()["columns"]
+
+def test_template_extraction(test_pdf_path):
+    """Test registering a form template and extracting its regions"""
+    print("\n=== Template Extraction Test ===")
+    base_url = f"http://{config.HOST}:{config.PORT}{config.API_V1_STR}"
+    
+    template = {"regions": [{"name": "title", "box": [0.0, 0.0, 1.0, 0.2]}]}
+    response = requests.put(f"{base_url}/templates/test-form", json=template)
+    print(f"Register Status Code: {response.status_code}")
+    assert response.status_code == 200
+    
+    with open(test_pdf_path, 'rb') as f:
+        files = {'file': ('test.pdf', f, 'application/pdf')}
+        data = {'template': 'test-form'}
+        response = requests.post(f"{base_url}/extract/template", files=files, data=data)
+    
+    print(f"Status Code: {response.status_code}")
+    print(f"Response: {response.json()}")
+    requests.delete(f"{base_url}/templates/test-form")
+    assert response.status_code == 200
+    assert "title" in response.json()["fields"]
+
+def test_job_submission(test_pdf_path):
+    """Test asynchronous job submission, status polling and result retrieval"""
+    print("\n=== Job API Test ===")
+    url = f"http://{config.HOST}:{config.PORT}{config.API_V1_STR}/jobs"
+    
+    with open(test_pdf_path, 'rb') as f:
+        files = {'file': ('test.pdf', f, 'application/pdf')}
+        data = {'mode': 'ocr', 'language': 'eng'}
+        response = requests.post(url, files=files, data=data)
+    
+    print(f"Status Code: {response.status_code}")
+    print(f"Response: {response.json()}")
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    
+    for _ in range(60):
+        status = requests.get(f"{url}/{job_id}").json()
+        if status["status"] in ("done", "failed", "cancelled"):
+            break
+        time.sleep(1)
+    
+    result = requests.get(f"{url}/{job_id}/result")
+    print(f"Job Status: {status}")
+    print(f"Result: {result.json()}")
+    assert status["status"] == "done"
+    assert result.status_code == 200
+
+def test_batch_extraction(test_pdf_path):
+    """Test batch extraction of several files in one request"""
+    print("\n=== Batch Extraction Test ===")
+    url = f"http://{config.HOST}:{config.PORT}{config.API_V1_STR}/extract/batch"
+    
+    with open(test_pdf_path, 'rb') as first, open(test_pdf_path, 'rb') as second:
+        files = [('files', ('first.pdf', first, 'application/pdf')), ('files', ('second.pdf', second, 'application/pdf'))]
+        data = {'mode': 'hybrid', 'language': 'eng'}
+        response = requests.post(url, files=files, data=data)
+    
+    print(f"Status Code: {response.status_code}")
+    print(f"Response: {response.json()}")
+    assert response.status_code == 200
+    assert [record["filename"] for record in response.json()["files"]] == ["first.pdf", "second.pdf"]
+
+def test_excel_extraction():
+    """Test paginated Excel extraction with sheet and column selection"""
+    print("\n=== Excel Extraction Test ===")
+    url = f"http://{config.HOST}:{config.PORT}{config.API_V1_STR}/extract/xls"
+    
+    temp_fd, temp_path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(temp_fd)
+    pd.DataFrame({"id": range(10), "name": [f"row {i}" for i in range(10)]}).to_excel(temp_path, index=False)
+    
+    try:
+        with open(temp_path, 'rb') as f:
+            files = {'file': ('test.xlsx', f)}
+            data = {'sheets': '1', 'columns': 'id', 'page_size': '4', 'page': '2'}
+            response = requests.post(url, files=files, data=data)
+    finally:
+        os.unlink(temp_path)
+    
+    print(f"Status Code: {response.status_code}")
+    print(f"Response: {response.json()}")
+    assert response.status_code == 200
+    assert response.json()["next_page"] == 3
 
 def main():
     print("Testing DataXtractor API...")
@@ -91,7 +218,13 @@ def main():
         # Run tests
         test_standard_extraction(test_pdf_path)
         test_ocr_extraction(test_pdf_path)
+        test_hybrid_extraction(test_pdf_path)
+        test_page_selection(test_pdf_path)
         test_column_extraction(test_pdf_path)
+        test_template_extraction(test_pdf_path)
+        test_job_submission(test_pdf_path)
+        test_batch_extraction(test_pdf_path)
+        test_excel_extraction()
         
     finally:
         # Clean up test PDF
@@ -0,0 +1,73 @@
+import io
+import sys
+import uuid
+from pathlib import Path
+
+from fpdf import FPDF
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import run
+from app import extraction
+from app.engine import PageResult
+from app.extraction import PDFExtractor
+from app.rendering import PageRenderer
+
+def create_pdf(text):
+    """A one-page PDF with ``text`` and a unique line, so its result is never cached"""
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    pdf.cell(200, 10, txt=text, ln=True)
+    pdf.cell(200, 10, txt=str(uuid.uuid4()), ln=True)
+    return bytes(pdf.output(dest='S').encode('latin-1'))
+
+def post_batch(mode, texts):
+    client = run.app.test_client()
+    files = [(io.BytesIO(create_pdf(text)), f"{index}.pdf") for index, text in enumerate(texts)]
+    return client.post(f"{run.config.API_V1_STR}/extract/batch", data={'mode': mode, 'files': files})
+
+def test_failed_page_task_is_reported_per_document(monkeypatch):
+    monkeypatch.setattr("config.OCR_WORKERS_PER_REQUEST", 1)  # run the page tasks in this process
+    text_layer = PDFExtractor._iter_text_layer
+
+    def failing_text_layer(pdf_path, last_page=None, pages=None):
+        for result in text_layer(pdf_path, last_page, pages):
+            if "broken" in result.text:
+                raise ValueError("Could not parse page")
+            yield result
+
+    monkeypatch.setattr(PDFExtractor, "_iter_text_layer", staticmethod(failing_text_layer))
+
+    response = post_batch('standard', ["first document", "broken document", "third document"])
+
+    assert response.status_code == 200
+    first, broken, third = response.json["files"]
+    assert "first document" in first["text"] and "third document" in third["text"]
+    assert broken == {"index": 1, "filename": "1.pdf", "error": "Could not parse page"}
+
+def test_failed_render_is_reported_per_document(monkeypatch):
+    monkeypatch.setattr("config.OCR_WORKERS_PER_REQUEST", 1)
+    monkeypatch.setattr(extraction, "_ocr_page",
+                        lambda rendered, **params: PageResult(page=rendered.page, text=f"page {rendered.page}"))
+    iter_pages = PageRenderer.iter_pages
+    calls = []
+
+    def failing_iter_pages(pdf_path, *args, **kwargs):
+        calls.append(pdf_path)
+        if len(calls) == 1:
+            raise RuntimeError("Could not render document")
+        return iter_pages(pdf_path, *args, **kwargs)
+
+    monkeypatch.setattr(PageRenderer, "iter_pages", failing_iter_pages)
+
+    response = post_batch('ocr', ["first document", "second document"])
+
+    assert response.status_code == 200
+    assert response.json["files"] == [
+        {"index": 0, "filename": "0.pdf", "error": "Could not render document"},
+        {"index": 1, "filename": "1.pdf", "text": "page 1\n"},
+    ]
@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from app.cache import ResultCache
+
+def age(cache, key, seconds):
+    """Pretend ``key`` was last used ``seconds`` ago"""
+    when = time.time() - seconds
+    os.utime(cache._path(key), (when, when))
+
+def test_disk_hit_from_another_instance(tmp_path):
+    writer = ResultCache("results", disk_dir=str(tmp_path))
+    reader = ResultCache("results", disk_dir=str(tmp_path))
+
+    writer.set("a" * 64, {"text": "hello"})
+
+    assert reader.get("a" * 64) == {"text": "hello"}
+    assert reader.counters["hits_disk"] == 1
+
+def test_disk_eviction_removes_least_recently_used(tmp_path):
+    cache = ResultCache("results", max_items=1, disk_dir=str(tmp_path), max_disk_bytes=300)
+    keys = [f"{index:02d}" + "0" * 62 for index in range(3)]
+    for offset, key in enumerate(keys):
+        cache.set(key, {"text": "x" * 80})
+        age(cache, key, 100 - offset)
+    cache.clear()
+    assert all(os.path.exists(cache._path(key)) for key in keys)
+
+    # Reading the oldest entry refreshes it, so the next write evicts the second one instead
+    assert cache.get(keys[0]) is not None
+    cache.set("ff" + "0" * 62, {"text": "x" * 80})
+
+    assert os.path.exists(cache._path(keys[0]))
+    assert not os.path.exists(cache._path(keys[1]))
+    assert cache.stats()["disk_bytes"] <= 300 * 0.9
+    cache.clear()
+    assert cache.get(keys[1]) is None
+
+def test_disk_eviction_rescans_shared_directory(tmp_path):
+    first = ResultCache("results", disk_dir=str(tmp_path), max_disk_bytes=250)
+    second = ResultCache("results", disk_dir=str(tmp_path), max_disk_bytes=250)
+    first.set("aa" + "0" * 62, {"text": "x" * 80})
+    first.set("bb" + "0" * 62, {"text": "x" * 80})
+    age(first, "aa" + "0" * 62, 100)
+
+    # The second process has not written yet; its first write accounts for the first's files
+    second.set("cc" + "0" * 62, {"text": "x" * 80})
+
+    assert not os.path.exists(first._path("aa" + "0" * 62))
+    assert os.path.exists(second._path("cc" + "0" * 62))
+
+def test_memory_tier_is_lru():
+    cache = ResultCache("results", max_items=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.counters["evictions"] == 1
+
+def test_memory_tier_is_bounded_by_size():
+    cache = ResultCache("results", max_items=10, max_memory_bytes=100)
+    cache.set("a", {"text": "x" * 40})
+    cache.set("b", {"text": "x" * 40})
+    cache.set("c", {"text": "x" * 40})
+
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    assert cache.stats()["memory_bytes"] <= 100
+
+def test_large_results_skip_memory_tier(tmp_path):
+    cache = ResultCache("results", disk_dir=str(tmp_path), max_memory_bytes=100)
+    cache.set("a" * 64, {"text": "x" * 200})
+
+    assert cache.stats()["items"] == 0
+    assert cache.get("a" * 64) == {"text": "x" * 200}
+    assert cache.counters["hits_disk"] == 1
+    assert cache.stats()["items"] == 0
@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from app.utils import TSV_COLUMNS, ExtractionUtils
+
+def create_page(column_spans, width=1000, height=400):
+    """A binarized page (white, 255) with a block of text-like ink in each (left, right) pixel span"""
+    page = np.full((height, width), 255, dtype=np.uint8)
+    for left, right in column_spans:
+        page[40:360:8, left:right] = 0
+    return page
+
+def create_words(rows):
+    """Tesseract word rows from (line_num, word_num, left, width, text)"""
+    return pd.DataFrame(
+        [[5, 1, 1, 1, line, word, left, 10 * line, width, 10, 95, text] for line, word, left, width, text in rows],
+        columns=TSV_COLUMNS,
+    )
+
+def test_detect_two_columns():
+    page = create_page([(50, 450), (550, 950)])
+
+    assert ExtractionUtils.detect_gutters(page) == [0.5]
+
+def test_detect_three_columns():
+    page = create_page([(50, 300), (350, 650), (700, 950)])
+
+    assert ExtractionUtils.detect_gutters(page) == [0.325, 0.675]
+
+def test_detect_no_gutter_in_single_column():
+    assert ExtractionUtils.detect_gutters(create_page([(50, 950)])) == []
+    assert ExtractionUtils.detect_gutters(create_page([])) == []
+
+def test_spanning_heading_keeps_gutter():
+    page = create_page([(50, 450), (550, 950)])
+    page[10:12, 50:950] = 0  # a thin heading line across both columns
+
+    assert ExtractionUtils.detect_gutters(page) == [0.5]
+
+def test_spanning_rules_keep_gutter():
+    page = np.full((400, 1000), 255, dtype=np.uint8)
+    page[40:360:16, 50:450] = 0  # sparse text
+    page[40:360:16, 550:950] = 0
+    page[10:14, :] = 0  # a full-width rule above the columns and a table border below
+    page[370:373, 50:950] = 0
+
+    assert ExtractionUtils.detect_gutters(page) == [0.5]
+
+def test_narrow_gap_is_not_a_gutter():
+    page = create_page([(50, 495), (505, 950)])
+
+    assert ExtractionUtils.detect_gutters(page) == []
+
+def test_max_gutters_keeps_widest():
+    page = create_page([(50, 200), (260, 500), (600, 950)])
+
+    assert ExtractionUtils.detect_gutters(page, max_gutters=1) == [0.55]
+
+def test_split_words_by_centre():
+    words = create_words([
+        (1, 1, 10, 80, "left"), (1, 2, 100, 80, "words"),
+        (1, 3, 520, 80, "right"), (1, 4, 610, 80, "side"),
+        (2, 1, 10, 80, "second"), (2, 2, 460, 80, "straddles"),
+    ])
+
+    # "straddles" spans the boundary at 500 px but its centre (500) lies on it: ties go right
+    assert ExtractionUtils.split_words_into_columns(words, 1000, [0.5]) == ["left words\nsecond", "right side\nstraddles"]
+
+def test_split_words_orders_by_line_and_partitions():
+    words = create_words([(2, 1, 700, 50, "d"), (1, 2, 800, 50, "b"), (1, 1, 100, 50, "a"), (2, 2, 300, 50, "c")])
+
+    assert ExtractionUtils.split_words_into_columns(words, 1000, [0.6, 0.25]) == ["a", "c", "b\nd"]
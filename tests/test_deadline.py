@@ -0,0 +1,102 @@
+import io
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fpdf import FPDF
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import run
+from app.engine import Deadline
+from app.rendering import PageSelection
+from app.routes import continuation, continuation_error, mode_params, parse_continuation, parse_page_selection
+
+def create_pdf(pages):
+    """PDF bytes with ``pages`` pages of text, each naming its page number"""
+    pdf = FPDF()
+    pdf.set_font("Arial", size=12)
+    for number in range(1, pages + 1):
+        pdf.add_page()
+        pdf.cell(200, 10, txt=f"This is page number {number} of the document.", ln=True)
+    return bytes(pdf.output(dest='S').encode('latin-1'))
+
+def spent_deadline():
+    """A deadline whose budget ran out, so ``reached`` is set by its ``limit``"""
+    deadline = Deadline(0.01)
+    deadline.start()
+    time.sleep(0.02)
+    list(deadline.limit(range(2)))
+    return deadline
+
+def test_limit_always_starts_one_item():
+    deadline = Deadline(0.01)
+    deadline.start()
+    time.sleep(0.02)
+
+    assert list(deadline.limit(range(5))) == [0]
+    assert deadline.reached
+
+def test_limit_stops_at_budget():
+    deadline = Deadline(0.05)
+
+    def slow_items():
+        for item in range(100):
+            time.sleep(0.01)
+            yield item
+
+    taken = list(deadline.limit(slow_items()))
+    assert 1 <= len(taken) < 100
+    assert deadline.reached
+
+def test_clock_starts_at_first_limit():
+    deadline = Deadline(0.05)
+    time.sleep(0.1)  # e.g. waiting for an admission slot
+
+    assert list(deadline.limit(range(3))) == [0, 1, 2]
+    assert not deadline.reached
+
+def test_continuation_round_trip():
+    source = create_pdf(4)
+    params = mode_params('hybrid', {'pages': '1-3'})
+
+    state = continuation('hybrid', source, params, spent_deadline(), done_pages=[1])
+
+    assert state["remaining_pages"] == [2, 3]
+    form = {'continuation': state["continuation"]}
+    assert parse_continuation(form['continuation'])['pages'] == [2, 3]
+    assert continuation_error(source, form) is None
+    assert parse_page_selection(form) == PageSelection(pages=(2, 3))
+
+def test_no_continuation_when_complete():
+    source = create_pdf(2)
+    params = mode_params('hybrid', {})
+
+    assert continuation('hybrid', source, params, Deadline(60), done_pages=[1, 2]) == {}
+    assert continuation('hybrid', source, params, spent_deadline(), done_pages=[1, 2]) == {}
+
+def test_continuation_rejects_other_document():
+    state = continuation('hybrid', create_pdf(3), mode_params('hybrid', {}), spent_deadline(), done_pages=[1])
+
+    assert continuation_error(create_pdf(2), {'continuation': state["continuation"]}) is not None
+
+@pytest.mark.parametrize("token", ["", "not base64!", "e30", "eyJwYWdlcyI6W119"])
+def test_invalid_continuation(token):
+    with pytest.raises(ValueError):
+        parse_continuation(token)
+
+def test_resume_extracts_remaining_pages():
+    source = create_pdf(3)
+    state = continuation('hybrid', source, mode_params('hybrid', {}), spent_deadline(), done_pages=[1])
+    client = run.app.test_client()
+
+    response = client.post(f"{run.config.API_V1_STR}/extract/hybrid",
+                           data={'file': (io.BytesIO(source), 'test.pdf'), 'continuation': state["continuation"]})
+
+    assert response.status_code == 200
+    assert [page["page"] for page in response.json["pages"]] == [2, 3]
+    assert "page number 2" in response.json["text"] and "page number 1" not in response.json["text"]
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+from pathlib import Path
+
+project_root = str(Path(__file__).parent.parent)
+
+# In a fresh interpreter: build the app, check no engine was imported, then touch each engine
+# from several threads at once
+CONCURRENT_FIRST_USE = """
+import sys, threading
+import run
+engines = ['cv2', 'pandas', 'pdfplumber', 'openpyxl', 'pdf2image', 'pytesseract']
+assert not [name for name in engines if name in sys.modules], 'engines imported at startup'
+from app import extraction, rendering, spreadsheet, utils
+attributes = [(utils.pd, 'DataFrame'), (utils.cv2, 'threshold'), (rendering.pdfplumber, 'open'),
+              (spreadsheet.openpyxl, 'load_workbook'), (rendering.pdf2image, 'convert_from_path'),
+              (utils.pytesseract, 'image_to_string'), (extraction.cv2, 'resize')]
+barrier, errors = threading.Barrier(8), []
+def touch():
+    barrier.wait()
+    for module, attribute in attributes:
+        try:
+            getattr(module, attribute)
+        except Exception as e:
+            errors.append(repr(e))
+threads = [threading.Thread(target=touch) for _ in range(8)]
+for thread in threads: thread.start()
+for thread in threads: thread.join()
+print(errors)
+"""
+
+def test_engines_load_once_across_threads():
+    output = subprocess.run([sys.executable, "-c", CONCURRENT_FIRST_USE], cwd=project_root,
+                            capture_output=True, text=True)
+
+    assert output.returncode == 0, output.stderr
+    assert output.stdout.strip().splitlines()[-1] == "[]"
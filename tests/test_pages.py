@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from app.rendering import PageSelection
+from app.routes import parse_page_selection
+
+def test_resolve_pages_within_range():
+    selection = PageSelection(pages=(1, 3, 5, 7, 9), first_page=3, last_page=7)
+
+    assert selection.resolve(10) == [3, 5, 7]
+
+def test_resolve_drops_missing_pages():
+    assert PageSelection(pages=(2, 12)).resolve(10) == [2]
+    assert PageSelection(first_page=8).resolve(10) == [8, 9, 10]
+
+def test_resolve_sample_spreads_over_selection():
+    assert PageSelection(sample=3).resolve(9) == [1, 5, 9]
+    assert PageSelection(first_page=2, last_page=3, sample=5).resolve(9) == [2, 3]
+
+def test_resolve_caps_at_max_pages(monkeypatch):
+    monkeypatch.setattr("config.MAX_PAGES", 4)
+
+    assert PageSelection().resolve(10) == [1, 2, 3, 4]
+
+def test_parse_page_selection():
+    assert parse_page_selection({}) is None
+    assert parse_page_selection({'pages': '1,3,5-7'}) == PageSelection(pages=(1, 3, 5, 6, 7))
+    assert parse_page_selection({'first_page': '2', 'last_page': '4', 'sample': '2'}) == \
+        PageSelection(first_page=2, last_page=4, sample=2)
+
+@pytest.mark.parametrize("form", [
+    {'pages': 'x'},
+    {'pages': '0'},
+    {'pages': '5-3'},
+    {'first_page': '0'},
+    {'sample': '-1'},
+    {'first_page': '4', 'last_page': '2'},
+    {'pages': '1-30000000'},
+    {'pages': '2-1,7'},
+])
+def test_parse_page_selection_rejects_invalid(form):
+    with pytest.raises(ValueError):
+        parse_page_selection(form)
+
+def test_parse_page_selection_bounds_ranges(monkeypatch):
+    monkeypatch.setattr("config.MAX_UPLOAD_PAGES", 10)
+
+    assert parse_page_selection({'pages': '9-10'}) == PageSelection(pages=(9, 10))
+    with pytest.raises(ValueError):
+        parse_page_selection({'pages': '9-11'})
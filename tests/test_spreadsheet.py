@@ -0,0 +1,42 @@
+import io
+import sys
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from app.spreadsheet import SheetReader
+
+def create_workbook(rows):
+    """An .xlsx workbook with one sheet holding ``rows`` (an empty list is a blank row)"""
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+def test_blank_rows_match_pandas():
+    """Interior blank rows are kept and trailing ones dropped, as pd.read_excel does"""
+    data = create_workbook([["name", "qty"], ["a", 1], [], [None, None], ["b", None], [None, 4], [], []])
+    expected = pd.read_excel(io.BytesIO(data)).fillna("").to_dict("records")
+
+    assert SheetReader.read(data)["Sheet"] == expected
+
+def test_chunk_row_numbers_follow_sheet_rows():
+    """NDJSON row numbers count interior blank rows, so they match the sheet"""
+    data = create_workbook([["name"], ["a"], [], ["b"]])
+
+    chunks = list(SheetReader.iter_chunks(data, 2))
+
+    assert [(row, [record["name"] for record in records]) for _, row, records in chunks] == [(1, ["a", ""]), (3, ["b"])]
+
+def test_blank_rows_before_header_are_skipped():
+    data = create_workbook([[], ["name"], ["a"]])
+
+    assert SheetReader.read(data)["Sheet"] == [{"name": "a"}]